@@ -17,15 +17,33 @@ Exogram Demo 脚本 - 若依管理系统操作日志查询演示
     # 或者跳过某些步骤（如已完成登录态）
     python demo_ruoyi.py --skip-auth
     python demo_ruoyi.py --skip-auth --skip-record
+
+    # 也可以单独执行某一步
+    python demo_ruoyi.py distill
+    python demo_ruoyi.py run
 """
 
-import subprocess
-import sys
+import importlib
 import os
-import argparse
+import sys
+import threading
 from pathlib import Path
 from datetime import datetime
 
+import typer
+
+demo_app = typer.Typer(add_completion=False, help="Exogram Demo 演示脚本")
+
+# 配置
+TOPIC = "RuoYiDemo"
+START_URL = "http://vue.ruoyi.vip/"
+AUTH_DOMAIN = "vue.ruoyi.vip"
+TASK = "帮我查一下'admin'账号在 2025年11月1日 到 12月1日 期间的操作日志"
+RECORDING_FILE = f"data/recordings/{TOPIC}.raw_steps.json"
+
+# 命令执行的工作目录（脚本所在目录，data/ 相对路径以此为准）
+_SCRIPT_DIR = Path(__file__).resolve().parent
+
 # ANSI 颜色码
 class Colors:
     HEADER = '\033[95m'
@@ -37,6 +55,11 @@ class Colors:
     ENDC = '\033[0m'
     BOLD = '\033[1m'
 
+def _emit(*lines: str) -> None:
+    """一次 write + flush 输出多行，减少终端写入次数"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
 def print_banner():
     """打印 Demo 横幅"""
     banner = f"""
@@ -55,187 +78,252 @@ def print_banner():
 ╚══════════════════════════════════════════════════════════════════╝
 {Colors.ENDC}
 """
-    print(banner)
+    _emit(banner)
 
 def print_step(step_num: int, title: str, description: str):
     """打印步骤标题"""
-    print(f"\n{Colors.BOLD}{Colors.GREEN}{'='*70}{Colors.ENDC}")
-    print(f"{Colors.BOLD}{Colors.YELLOW}  步骤 {step_num}/4: {title}{Colors.ENDC}")
-    print(f"{Colors.CYAN}  {description}{Colors.ENDC}")
-    print(f"{Colors.BOLD}{Colors.GREEN}{'='*70}{Colors.ENDC}\n")
+    _emit(
+        f"\n{Colors.BOLD}{Colors.GREEN}{'='*70}{Colors.ENDC}",
+        f"{Colors.BOLD}{Colors.YELLOW}  步骤 {step_num}/4: {title}{Colors.ENDC}",
+        f"{Colors.CYAN}  {description}{Colors.ENDC}",
+        f"{Colors.BOLD}{Colors.GREEN}{'='*70}{Colors.ENDC}\n",
+    )
 
 def wait_for_user(message: str = "按 Enter 继续..."):
     """等待用户确认"""
     print(f"\n{Colors.YELLOW}{Colors.BOLD}👉 {message}{Colors.ENDC}")
     input()
 
-def run_command(args: list, description: str) -> bool:
-    """运行命令并显示输出"""
-    print(f"{Colors.BLUE}▶ 执行: {' '.join(args)}{Colors.ENDC}\n")
-    
+def _prewarm() -> None:
+    """预加载 exogram 及其重量级依赖（openai / langchain / browser-use），在用户阅读提示时完成"""
+    for name in ("exogram.cli", "exogram.distillation.semantic_distiller", "exogram.execution", "exogram.recording"):
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+def run_exogram(args: list[str], description: str) -> bool:
+    """在当前进程内执行 exogram 命令（与 `exogram ...` 命令行等价）"""
+    print(f"{Colors.BLUE}▶ 执行: exogram {' '.join(args)}{Colors.ENDC}\n", flush=True)
+
+    from exogram.cli import app
+
     try:
-        result = subprocess.run(
-            args,
-            cwd=Path(__file__).parent,
-            env={**os.environ},
-        )
-        
-        if result.returncode == 0:
-            print(f"\n{Colors.GREEN}✅ {description} 完成!{Colors.ENDC}")
-            return True
-        else:
-            print(f"\n{Colors.RED}❌ {description} 失败 (退出码: {result.returncode}){Colors.ENDC}")
-            return False
-            
+        code = app(args, standalone_mode=False)
     except KeyboardInterrupt:
-        print(f"\n{Colors.YELLOW}⚠️  用户中断{Colors.ENDC}")
-        return True  # 用户手动中断视为正常
+        code = 130
     except Exception as e:
         print(f"\n{Colors.RED}❌ 错误: {e}{Colors.ENDC}")
         return False
 
-def main():
-    parser = argparse.ArgumentParser(description="Exogram Demo 演示脚本")
-    parser.add_argument("--skip-auth", action="store_true", help="跳过登录态初始化")
-    parser.add_argument("--skip-record", action="store_true", help="跳过录制步骤")
-    parser.add_argument("--skip-distill", action="store_true", help="跳过蒸馏步骤")
-    args = parser.parse_args()
+    if code == 130:
+        print(f"\n{Colors.YELLOW}⚠️  用户中断{Colors.ENDC}")
+        return True  # 用户手动中断视为正常
+    if not code:
+        print(f"\n{Colors.GREEN}✅ {description} 完成!{Colors.ENDC}")
+        return True
+    print(f"\n{Colors.RED}❌ {description} 失败 (退出码: {code}){Colors.ENDC}")
+    return False
+
+def print_intro():
+    """打印演示任务信息"""
+    _emit(
+        f"{Colors.BOLD}📋 演示任务:{Colors.ENDC}",
+        f"   {Colors.CYAN}{TASK}{Colors.ENDC}",
+        f"\n{Colors.BOLD}🌐 目标网站:{Colors.ENDC} {START_URL}",
+        f"{Colors.BOLD}📁 Topic:{Colors.ENDC} {TOPIC}",
+        f"{Colors.BOLD}⏰ 开始时间:{Colors.ENDC} {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+    )
+
+def print_summary():
+    """打印演示完成摘要"""
+    print(f"""
+{Colors.GREEN}{Colors.BOLD}
+╔══════════════════════════════════════════════════════════════════╗
+║                                                                  ║
+║                      🎉 演示完成！🎉                              ║
+║                                                                  ║
+╚══════════════════════════════════════════════════════════════════╝
+{Colors.ENDC}
+{Colors.CYAN}演示摘要:{Colors.ENDC}
+  • Topic: {TOPIC}
+  • 任务: {TASK}
+  • 完成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+{Colors.YELLOW}生成的文件:{Colors.ENDC}
+  • 录制文件: data/recordings/{TOPIC}.raw_steps.json
+  • 认知文件: data/memory/{TOPIC}.jsonl
+  • 执行日志: data/runs/
+
+感谢使用 Exogram! 🚀
+""")
+
+# ========== 步骤 1: 登录态初始化 ==========
+def step_setup_auth() -> bool:
+    print_step(1, "setup-auth (登录态初始化)", 
+               "打开浏览器，手动登录若依管理系统 (admin/admin123)")
+    
+    _emit(
+        f"{Colors.YELLOW}💡 提示:{Colors.ENDC}",
+        f"   1. 浏览器将自动打开若依管理系统登录页",
+        f"   2. 请使用账号 {Colors.BOLD}admin{Colors.ENDC} / 密码 {Colors.BOLD}admin123{Colors.ENDC} 登录",
+        f"   3. 登录成功后，按 {Colors.BOLD}Ctrl+C{Colors.ENDC} 结束此步骤",
+    )
     
-    # 配置
-    TOPIC = "RuoYiDemo"
-    START_URL = "http://vue.ruoyi.vip/"
-    AUTH_DOMAIN = "vue.ruoyi.vip"
-    TASK = "帮我查一下'admin'账号在 2025年11月1日 到 12月1日 期间的操作日志"
-    RECORDING_FILE = f"data/recordings/{TOPIC}.raw_steps.json"
+    wait_for_user()
     
-    # Python 解释器
-    python = sys.executable
+    return run_exogram([
+        "setup-auth",
+        "--start-url", START_URL,
+    ], "登录态初始化")
+
+# ========== 步骤 2: 录制操作 ==========
+def step_record() -> bool:
+    print_step(2, "record-live (录制操作)", 
+               "录制一次查询操作日志的完整流程")
     
-    print_banner()
+    _emit(
+        f"{Colors.YELLOW}💡 录制指引:{Colors.ENDC}",
+        f"   1. 点击左侧菜单 {Colors.BOLD}「系统监控」{Colors.ENDC}",
+        f"   2. 展开后点击 {Colors.BOLD}「操作日志」{Colors.ENDC}",
+        f"   3. 在操作人员输入框输入 {Colors.BOLD}admin{Colors.ENDC}",
+        f"   4. 选择操作时间范围 {Colors.BOLD}2025-11-01 ~ 2025-12-01{Colors.ENDC}",
+        f"   5. 点击 {Colors.BOLD}「搜索」{Colors.ENDC} 按钮",
+        f"   6. 录制完成后，按 {Colors.BOLD}Ctrl+C{Colors.ENDC} 结束录制",
+    )
     
-    print(f"{Colors.BOLD}📋 演示任务:{Colors.ENDC}")
-    print(f"   {Colors.CYAN}{TASK}{Colors.ENDC}")
-    print(f"\n{Colors.BOLD}🌐 目标网站:{Colors.ENDC} {START_URL}")
-    print(f"{Colors.BOLD}📁 Topic:{Colors.ENDC} {TOPIC}")
-    print(f"{Colors.BOLD}⏰ 开始时间:{Colors.ENDC} {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    wait_for_user()
+    
+    return run_exogram([
+        "record-live",
+        "--topic", TOPIC,
+        "--start-url", START_URL,
+        "--auth-domain", AUTH_DOMAIN,
+    ], "录制操作")
+
+# ========== 步骤 3: 蒸馏认知 ==========
+def step_distill() -> bool:
+    print_step(3, "distill (蒸馏认知)", 
+               "AI 分析录制的操作，提取可复用的认知")
+    
+    _emit(
+        f"{Colors.YELLOW}💡 说明:{Colors.ENDC}",
+        f"   此步骤将自动进行，AI 会分析你刚才的操作",
+        f"   并提取出「如何查询操作日志」的通用知识",
+    )
     
+    wait_for_user()
+    
+    success = run_exogram([
+        "distill",
+        "--recording", RECORDING_FILE,
+        "-v",
+    ], "蒸馏认知")
+    
+    if not success:
+        print(f"\n{Colors.RED}⚠️  蒸馏失败，请检查录制文件是否存在{Colors.ENDC}")
+    return success
+
+# ========== 步骤 4: 执行任务 ==========
+def step_run() -> bool:
+    print_step(4, "run (执行任务)", 
+               "基于学到的认知，自动执行查询任务")
+    
+    _emit(
+        f"{Colors.YELLOW}💡 说明:{Colors.ENDC}",
+        f"   现在 AI 将自动执行任务:",
+        f"   {Colors.CYAN}\"{TASK}\"{Colors.ENDC}",
+        f"   ",
+        f"   观察 AI 如何自主完成操作!",
+    )
+    
+    wait_for_user()
+    
+    return run_exogram([
+        "run",
+        "--topic", TOPIC,
+        "--task", TASK,
+    ], "执行任务")
+
+def run_all(*, skip_auth: bool, skip_record: bool, skip_distill: bool) -> None:
+    """按顺序执行四个步骤"""
+    print_banner()
+    print_intro()
+    
+    # 用户阅读说明、手动登录/录制的时间里，后台预热后续步骤用到的依赖
+    threading.Thread(target=_prewarm, daemon=True).start()
     wait_for_user("准备好开始演示了吗？按 Enter 开始...")
     
-    # ========== 步骤 1: 登录态初始化 ==========
-    if not args.skip_auth:
-        print_step(1, "setup-auth (登录态初始化)", 
-                   "打开浏览器，手动登录若依管理系统 (admin/admin123)")
-        
-        print(f"{Colors.YELLOW}💡 提示:{Colors.ENDC}")
-        print(f"   1. 浏览器将自动打开若依管理系统登录页")
-        print(f"   2. 请使用账号 {Colors.BOLD}admin{Colors.ENDC} / 密码 {Colors.BOLD}admin123{Colors.ENDC} 登录")
-        print(f"   3. 登录成功后，按 {Colors.BOLD}Ctrl+C{Colors.ENDC} 结束此步骤")
-        
-        wait_for_user()
-        
-        run_command([
-            python, "-m", "exogram.cli",
-            "setup-auth",
-            "--start-url", START_URL
-        ], "登录态初始化")
-        
+    if not skip_auth:
+        step_setup_auth()
         wait_for_user("登录完成后，按 Enter 继续下一步...")
     else:
         print(f"\n{Colors.YELLOW}⏭️  跳过步骤 1: setup-auth{Colors.ENDC}")
     
-    # ========== 步骤 2: 录制操作 ==========
-    if not args.skip_record:
-        print_step(2, "record-live (录制操作)", 
-                   "录制一次查询操作日志的完整流程")
-        
-        print(f"{Colors.YELLOW}💡 录制指引:{Colors.ENDC}")
-        print(f"   1. 点击左侧菜单 {Colors.BOLD}「系统监控」{Colors.ENDC}")
-        print(f"   2. 展开后点击 {Colors.BOLD}「操作日志」{Colors.ENDC}")
-        print(f"   3. 在操作人员输入框输入 {Colors.BOLD}admin{Colors.ENDC}")
-        print(f"   4. 选择操作时间范围 {Colors.BOLD}2025-11-01 ~ 2025-12-01{Colors.ENDC}")
-        print(f"   5. 点击 {Colors.BOLD}「搜索」{Colors.ENDC} 按钮")
-        print(f"   6. 录制完成后，按 {Colors.BOLD}Ctrl+C{Colors.ENDC} 结束录制")
-        
-        wait_for_user()
-        
-        run_command([
-            python, "-m", "exogram.cli",
-            "record-live",
-            "--topic", TOPIC,
-            "--start-url", START_URL,
-            "--auth-domain", AUTH_DOMAIN
-        ], "录制操作")
-        
+    if not skip_record:
+        step_record()
         wait_for_user("录制完成后，按 Enter 继续下一步...")
     else:
         print(f"\n{Colors.YELLOW}⏭️  跳过步骤 2: record-live{Colors.ENDC}")
     
-    # ========== 步骤 3: 蒸馏认知 ==========
-    if not args.skip_distill:
-        print_step(3, "distill (蒸馏认知)", 
-                   "AI 分析录制的操作，提取可复用的认知")
-        
-        print(f"{Colors.YELLOW}💡 说明:{Colors.ENDC}")
-        print(f"   此步骤将自动进行，AI 会分析你刚才的操作")
-        print(f"   并提取出「如何查询操作日志」的通用知识")
-        
-        wait_for_user()
-        
-        success = run_command([
-            python, "-m", "exogram.cli",
-            "distill",
-            "--recording", RECORDING_FILE,
-            "-v"
-        ], "蒸馏认知")
-        
-        if not success:
-            print(f"\n{Colors.RED}⚠️  蒸馏失败，请检查录制文件是否存在{Colors.ENDC}")
+    if not skip_distill:
+        if not step_distill():
             return
-        
         wait_for_user("蒸馏完成，按 Enter 继续最后一步...")
     else:
         print(f"\n{Colors.YELLOW}⏭️  跳过步骤 3: distill{Colors.ENDC}")
     
-    # ========== 步骤 4: 执行任务 ==========
-    print_step(4, "run (执行任务)", 
-               "基于学到的认知，自动执行查询任务")
-    
-    print(f"{Colors.YELLOW}💡 说明:{Colors.ENDC}")
-    print(f"   现在 AI 将自动执行任务:")
-    print(f"   {Colors.CYAN}\"{TASK}\"{Colors.ENDC}")
-    print(f"   ")
-    print(f"   观察 AI 如何自主完成操作!")
-    
-    wait_for_user()
-    
-    run_command([
-        python, "-m", "exogram.cli",
-        "run",
-        "--topic", TOPIC,
-        "--task", TASK
-    ], "执行任务")
+    step_run()
     
-    # ========== 完成 ==========
-    print(f"""
-{Colors.GREEN}{Colors.BOLD}
-╔══════════════════════════════════════════════════════════════════╗
-║                                                                  ║
-║                      🎉 演示完成！🎉                              ║
-║                                                                  ║
-╚══════════════════════════════════════════════════════════════════╝
-{Colors.ENDC}
-{Colors.CYAN}演示摘要:{Colors.ENDC}
-  • Topic: {TOPIC}
-  • 任务: {TASK}
-  • 完成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+    print_summary()
 
-{Colors.YELLOW}生成的文件:{Colors.ENDC}
-  • 录制文件: data/recordings/{TOPIC}.raw_steps.json
-  • 认知文件: data/memory/{TOPIC}.jsonl
-  • 执行日志: data/runs/
+# ========== 命令行入口 ==========
 
-感谢使用 Exogram! 🚀
-""")
+_SKIP_AUTH = typer.Option(False, "--skip-auth", help="跳过登录态初始化")
+_SKIP_RECORD = typer.Option(False, "--skip-record", help="跳过录制步骤")
+_SKIP_DISTILL = typer.Option(False, "--skip-distill", help="跳过蒸馏步骤")
+
+@demo_app.callback(invoke_without_command=True)
+def main(
+    ctx: typer.Context,
+    skip_auth: bool = _SKIP_AUTH,
+    skip_record: bool = _SKIP_RECORD,
+    skip_distill: bool = _SKIP_DISTILL,
+):
+    """不带子命令时执行完整演示（兼容旧的 --skip-* 用法）"""
+    os.chdir(_SCRIPT_DIR)
+    if ctx.invoked_subcommand is None:
+        run_all(skip_auth=skip_auth, skip_record=skip_record, skip_distill=skip_distill)
+
+@demo_app.command("run-all")
+def run_all_cmd(
+    skip_auth: bool = _SKIP_AUTH,
+    skip_record: bool = _SKIP_RECORD,
+    skip_distill: bool = _SKIP_DISTILL,
+):
+    """按顺序执行完整的四步演示"""
+    run_all(skip_auth=skip_auth, skip_record=skip_record, skip_distill=skip_distill)
+
+@demo_app.command("setup")
+def setup_cmd():
+    """步骤 1：登录态初始化"""
+    step_setup_auth()
+
+@demo_app.command("record")
+def record_cmd():
+    """步骤 2：录制操作"""
+    step_record()
+
+@demo_app.command("distill")
+def distill_cmd():
+    """步骤 3：蒸馏认知"""
+    if not step_distill():
+        raise typer.Exit(code=1)
+
+@demo_app.command("run")
+def run_cmd():
+    """步骤 4：执行任务"""
+    step_run()
 
 if __name__ == "__main__":
-    main()
+    demo_app()
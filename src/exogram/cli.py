@@ -1,22 +1,22 @@
 from __future__ import annotations
 
-import json
 import os
 import uuid
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, NamedTuple
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 import typer
 from dotenv import load_dotenv
 
 from exogram.config import load_settings
-from exogram.execution import Executor, InteractiveSession
-from exogram.memory import JsonlMemoryStore
-from exogram.models import RawStepsDocument
-from exogram.recording import WorkflowUseJsonAdapter
 from exogram.utils import ensure_dir, read_json, write_json
 
+if TYPE_CHECKING:
+    from exogram.models import CognitionRecord
+    from exogram.models_rich import RichCognitionRecord
+
 app = typer.Typer(no_args_is_help=True, add_completion=False, rich_markup_mode="markdown")
 
 
@@ -25,7 +25,9 @@ app = typer.Typer(no_args_is_help=True, add_completion=False, rich_markup_mode="
 # =====================================================================
 
 
+@lru_cache(maxsize=8)
 def _resolve_data_paths(data_dir: Path) -> dict[str, Path]:
+    """按 data_dir 缓存的数据目录布局（返回值共享，调用方不应修改）。"""
     return {
         "recordings_dir": data_dir / "recordings",
         "memory_dir": data_dir / "memory",
@@ -41,13 +43,19 @@ class _CognitionBundle(NamedTuple):
     n_elements: int
 
 
+def _load_cognition(cog_path: Path) -> RichCognitionRecord:
+    """加载单个 cognition.json。"""
+    from exogram.models_rich import RichCognitionRecord
+
+    # 直接从 bytes 校验：JSON 解析与模型构建都在 pydantic-core 中一次完成
+    return RichCognitionRecord.model_validate_json(cog_path.read_bytes())
+
+
 def _load_cognition_and_wisdom(cog_path: Path) -> _CognitionBundle:
     """从 cognition.json 加载认知记录并构建 wisdom 字符串。"""
-    from exogram.models_rich import RichCognitionRecord
     from exogram.execution.context import CognitiveContextManager
 
-    cog_data = json.loads(cog_path.read_text(encoding="utf-8"))
-    record = RichCognitionRecord.model_validate(cog_data)
+    record = _load_cognition(cog_path)
     start_url = record.website.url or record.meta.start_url
     wisdom = CognitiveContextManager(record).build_system_instruction()
     return _CognitionBundle(
@@ -76,6 +84,8 @@ def record(
     paths = _resolve_data_paths(settings.data_dir)
     ensure_dir(paths["recordings_dir"])
 
+    from exogram.recording import WorkflowUseJsonAdapter
+
     adapter = WorkflowUseJsonAdapter()
     doc = adapter.load(workflow_json, topic=topic)
 
@@ -183,6 +193,8 @@ def distill(
     recording: Path = typer.Option(..., "--recording", exists=True, dir_okay=False, help="RawSteps JSON（由 exogram record 生成）"),
     out: Path | None = typer.Option(None, "--out", help="输出认知文档路径（默认替换 .raw_steps.json 为 .cognition.json）"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="输出详细日志"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="不使用 LLM 响应缓存（~/.exogram/llm_cache），强制重新调用模型"),
+    semantic_cache: bool = typer.Option(False, "--semantic-cache", help="启用语义缓存：与历史录制摘要足够相似时复用其蒸馏结果（需要 embedding 接口）"),
 ) -> None:
     """
     语义蒸馏：分析录制的操作步骤，生成完整的操作认知文档。
@@ -199,12 +211,14 @@ def distill(
 
         exogram distill --recording data/recordings/DemoLive.raw_steps.json
         exogram distill --recording demo.json --out demo.cognition.json -v
+        exogram distill --recording demo.json --no-cache
     """
     load_dotenv()
     settings = load_settings()
 
-    raw_obj = read_json(recording)
-    raw_doc = RawStepsDocument.model_validate(raw_obj)
+    from exogram.models import RawStepsDocument
+
+    raw_doc = RawStepsDocument.model_validate_json(recording.read_bytes())
 
     if out:
         out_path = out
@@ -213,6 +227,7 @@ def distill(
         if str(recording).endswith(".raw_steps.json"):
             out_path = Path(str(recording).replace(".raw_steps.json", ".cognition.json"))
 
+    from exogram.distillation.cache import LLMCache, SemanticCache
     from exogram.distillation.semantic_distiller import SemanticDistiller
 
     api_key = os.getenv("DISTILLATION_OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
@@ -224,20 +239,37 @@ def distill(
         typer.echo(f"API: {base_url}")
 
     try:
+        sem_cache = None
+        if semantic_cache and not no_cache:
+            from langchain_openai import OpenAIEmbeddings
+
+            embeddings = OpenAIEmbeddings(
+                model=os.getenv("DISTILLATION_EMBEDDING_MODEL", "text-embedding-3-small"),
+                api_key=api_key,
+                base_url=base_url,
+            )
+            sem_cache = SemanticCache(
+                embeddings.embed_query,
+                threshold=float(os.getenv("DISTILLATION_SEMANTIC_THRESHOLD", "0.93")),
+            )
+
         distiller = SemanticDistiller(
             api_key=api_key,
             base_url=base_url,
             model=model,
             temperature=settings.llm_temperature,
+            json_mode=os.getenv("DISTILLATION_JSON_MODE", "1") == "1",
+            cache=None if no_cache else LLMCache(),
+            semantic_cache=sem_cache,
         )
         result = distiller.distill(raw_doc, verbose=verbose)
     except Exception as e:
         typer.secho(f"蒸馏失败: {e}", fg=typer.colors.RED)
         raise typer.Exit(code=1) from e
 
-    result_dict = result.model_dump(mode="json", by_alias=True)
+    # 直接由 pydantic-core 序列化（非 ASCII 原样保留），省掉中间 dict
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(json.dumps(result_dict, ensure_ascii=False, indent=2), encoding="utf-8")
+    out_path.write_text(result.model_dump_json(by_alias=True, indent=2), encoding="utf-8")
 
     typer.secho(f"已生成操作认知: {out_path}", fg=typer.colors.GREEN)
     typer.echo(f"- 网站: {result.website.name}")
@@ -246,10 +278,41 @@ def distill(
     typer.echo(f"- 关键元素: {len(result.key_elements)} 个")
 
 
+def _cognition_to_fields(cog_data: dict, *, default_topic: str, now: datetime | str) -> dict[str, Any]:
+    """把 cognition.json 的内容按字段投影为 CognitionRecord 的字段 dict（不做校验）。
+
+    created_at 原样保留（ISO 字符串 / epoch 秒或毫秒），缺失时用 now。
+    """
+    meta = cog_data.get("_meta", {})
+    knowledge = cog_data.get("operation_knowledge", {})
+    task = cog_data.get("task", {})
+    return {
+        "id": meta.get("id", str(uuid.uuid4())),
+        "topic": meta.get("topic", default_topic),
+        "created_at": meta.get("created_at") or now,
+        "source_recording": meta.get("source"),
+        "task_tags": [task.get("summary", "")],
+        "key_path_features": [el.get("name", "") for el in cog_data.get("key_elements", [])],
+        "preference_rules": list(knowledge.get("form_filling_tips", [])),
+        "exception_handling": list(knowledge.get("precautions", [])),
+        "anti_patterns": [],
+        "summary": task.get("goal", "") or cog_data.get("website", {}).get("description", ""),
+    }
+
+
+def _cognition_to_record(cog_data: dict, *, default_topic: str, now: datetime) -> CognitionRecord:
+    """把 cognition.json 的内容投影为 CognitionRecord（供记忆库检索），created_at 交给 pydantic 解析。"""
+    from exogram.models import CognitionRecord
+
+    return CognitionRecord(**_cognition_to_fields(cog_data, default_topic=default_topic, now=now))
+
+
 @app.command()
 def memorize(
-    cognition: Path = typer.Option(..., "--cognition", exists=True, dir_okay=False, help="cognition.json 文件路径"),
+    cognition: Path | None = typer.Option(None, "--cognition", exists=True, dir_okay=False, help="cognition.json 文件路径"),
+    cognition_dir: Path | None = typer.Option(None, "--cognition-dir", exists=True, file_okay=False, help="批量导入目录下所有 *.cognition.json"),
     memory_jsonl: Path | None = typer.Option(None, "--memory", help="记忆库路径（默认 data/memory/memory.jsonl）"),
+    fast: bool = typer.Option(False, "--fast", help="批量导入快速路径：跳过 pydantic 校验，按字段投影后直接写入"),
 ) -> None:
     """
     记忆：将认知文档导入到长期记忆库。
@@ -257,35 +320,51 @@ def memorize(
     **示例**
 
         exogram memorize --cognition data/recordings/DemoLive.cognition.json
+        exogram memorize --cognition-dir data/recordings --fast
     """
+    if not cognition and not cognition_dir:
+        typer.secho("❌ 请指定 --cognition 或 --cognition-dir", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
     load_dotenv()
     settings = load_settings()
     paths = _resolve_data_paths(settings.data_dir)
 
     mem_path = memory_jsonl or paths["memory_jsonl"]
 
-    cog_data = read_json(cognition)
-
-    from exogram.models import CognitionRecord
+    from exogram.memory import JsonlMemoryStore
 
-    topic = cog_data.get("_meta", {}).get("topic", cognition.stem)
-    record = CognitionRecord(
-        id=cog_data.get("_meta", {}).get("id", str(uuid.uuid4())),
-        topic=topic,
-        created_at=datetime.fromisoformat(cog_data.get("_meta", {}).get("created_at", datetime.now(timezone.utc).isoformat())),
-        source_recording=cog_data.get("_meta", {}).get("source"),
-        task_tags=[cog_data.get("task", {}).get("summary", "")],
-        key_path_features=[el.get("name", "") for el in cog_data.get("key_elements", [])],
-        preference_rules=[tip for tip in cog_data.get("operation_knowledge", {}).get("form_filling_tips", [])],
-        exception_handling=[p for p in cog_data.get("operation_knowledge", {}).get("precautions", [])],
-        anti_patterns=[],
-        summary=cog_data.get("task", {}).get("goal", "") or cog_data.get("website", {}).get("description", ""),
-    )
+    files = [cognition] if cognition else []
+    if cognition_dir:
+        files.extend(sorted(cognition_dir.glob("*.cognition.json")))
 
+    now = datetime.now(timezone.utc)
     store = JsonlMemoryStore(mem_path)
-    store.append(record)
 
-    typer.secho(f"✓ 已将 '{topic}' 导入记忆库: {mem_path}", fg=typer.colors.GREEN)
+    if fast:
+        now_iso = now.isoformat()
+        rows = [
+            _cognition_to_fields(read_json(f), default_topic=f.stem, now=now_iso)
+            for f in files
+        ]
+        try:
+            store.append_raw_many(rows)
+        except ValueError as e:
+            typer.secho(f"❌ 导入失败（未写入任何记录）: {e}", fg=typer.colors.RED)
+            raise typer.Exit(code=1) from e
+        topics = [row["topic"] for row in rows]
+    else:
+        records = [
+            _cognition_to_record(read_json(f), default_topic=f.stem, now=now)
+            for f in files
+        ]
+        store.append_many(records)
+        topics = [r.topic for r in records]
+
+    for t in topics:
+        typer.secho(f"✓ 已将 '{t}' 导入记忆库: {mem_path}", fg=typer.colors.GREEN)
+    if cognition_dir and not topics:
+        typer.secho(f"⚠️ 目录下没有 *.cognition.json: {cognition_dir}", fg=typer.colors.YELLOW)
 
 
 @app.command()
@@ -340,6 +419,8 @@ def run(
         typer.echo("🛡️ 安全模式已开启（写操作将只导航不执行）")
 
     # 3. 创建 Executor
+    from exogram.execution import Executor, InteractiveSession
+
     typer.echo(f"\n🚀 开始执行任务...")
     executor = Executor(
         model=model or settings.agent_model,
@@ -354,7 +435,7 @@ def run(
 
     # 4. 分派执行模式
     if no_interactive:
-        executor.run_sync(task=task, wisdom=bundle.wisdom)
+        executor.run_sync(task=task, wisdom=bundle.wisdom).release_history()
         typer.secho("✅ 执行完成!", fg=typer.colors.GREEN)
     else:
         session = InteractiveSession(executor, wisdom=bundle.wisdom, safe_mode=safe_mode)
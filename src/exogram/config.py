@@ -2,10 +2,11 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Settings:
     data_dir: Path
     distill_model: str
@@ -17,7 +18,9 @@ class Settings:
     llm_max_tokens: int
 
 
+@lru_cache(maxsize=1)
 def load_settings() -> Settings:
+    # 进程内只解析一次环境变量；修改环境变量后需调用 load_settings.cache_clear()
     data_dir = Path(os.getenv("EXOGRAM_DATA_DIR", "./data")).resolve()
     distill_model = os.getenv("EXOGRAM_DISTILL_MODEL", "gpt-4o")
     agent_model = os.getenv("EXECUTION_MODEL") or os.getenv("EXOGRAM_AGENT_MODEL", "gpt-4o")
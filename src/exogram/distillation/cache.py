@@ -0,0 +1,149 @@
+"""
+LLM 响应缓存
+
+- LLMCache：按 prompt 输入 + 模型名的 SHA-256 作为 key，把 LLM 原始输出落盘到 {key}.json。
+  同一份录制重复蒸馏时直接命中缓存，跳过网络调用。
+- SemanticCache：按 prompt 摘要的 embedding 相似度复用输出，覆盖"同一任务重新录制"的近似重复场景。
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+from pathlib import Path
+from typing import Callable
+
+from exogram.utils import atomic_write_text, ensure_dir, get_logger, json_dumps, json_loads
+
+logger = get_logger("Distill")
+
+DEFAULT_LLM_CACHE_DIR = Path.home() / ".exogram" / "llm_cache"
+
+
+class LLMCache:
+    """基于目录的 LLM 输出缓存（一条记录一个文件，写入原子化）。"""
+
+    def __init__(self, cache_dir: Path | None = None) -> None:
+        self.cache_dir = cache_dir or DEFAULT_LLM_CACHE_DIR
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(prompt_input: dict, *, model: str, params: dict | None = None) -> str:
+        """
+        prompt 输入 + 模型名 + 生成参数（均按 key 排序序列化）→ 稳定的 SHA-256 key。
+
+        params 应包含会影响输出的一切：prompt 模板指纹、temperature、max_tokens、JSON 模式等，
+        修改 prompt 或参数后自然不再命中旧缓存。
+        """
+        payload = json_dumps(prompt_input, sort_keys=True)
+        if params:
+            payload += "\0" + json_dumps(params, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8") + b"\0" + model.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        try:
+            data = json_loads(self._path(key).read_bytes())
+            output = data["output"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # 不存在 / 损坏的缓存文件都按未命中处理
+            self.misses += 1
+            return None
+        self.hits += 1
+        return output
+
+    def set(self, key: str, output: str, *, model: str | None = None) -> None:
+        ensure_dir(self.cache_dir)
+        content = json_dumps({"model": model, "output": output})
+        # 原子写入，避免并发/中断时留下半截文件
+        atomic_write_text(self._path(key), content)
+
+    def stats(self) -> str:
+        return f"hits={self.hits} misses={self.misses}"
+
+
+DEFAULT_SEMANTIC_CACHE_DIR = Path.home() / ".exogram" / "semantic_cache"
+
+
+def _normalize(vec: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vec))
+    if norm == 0:
+        return list(vec)
+    return [x / norm for x in vec]
+
+
+class SemanticCache:
+    """
+    近似重复 prompt 的语义缓存（可选）。
+
+    对 prompt 的规范化摘要做 embedding，与历史条目的余弦相似度 >= threshold 时复用其 LLM 输出。
+    可选的 sig（如录制的步骤序列签名）必须与条目完全一致才会命中，避免内容相近但流程不同的录制互相复用。
+    条目追加写入 {cache_dir}/entries.jsonl；向量已归一化，相似度即点积（条目量级很小，线性扫描即可）。
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], list[float]],
+        *,
+        cache_dir: Path | None = None,
+        threshold: float = 0.93,
+    ) -> None:
+        self.embed = embed
+        self.cache_dir = cache_dir or DEFAULT_SEMANTIC_CACHE_DIR
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._entries: list[tuple[str | None, str | None, list[float], str]] | None = None
+
+    @property
+    def _file(self) -> Path:
+        return self.cache_dir / "entries.jsonl"
+
+    def _load(self) -> list[tuple[str | None, str | None, list[float], str]]:
+        if self._entries is not None:
+            return self._entries
+        entries: list[tuple[str | None, str | None, list[float], str]] = []
+        try:
+            lines = self._file.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            lines = []
+        for line in lines:
+            try:
+                obj = json_loads(line)
+                entries.append((obj.get("model"), obj.get("sig"), obj["vector"], obj["output"]))
+            except (ValueError, KeyError, TypeError):
+                continue
+        self._entries = entries
+        return entries
+
+    def embed_text(self, text: str) -> list[float]:
+        return _normalize(self.embed(text))
+
+    def lookup(self, vector: list[float], *, model: str | None = None, sig: str | None = None) -> str | None:
+        """返回相似度最高且超过阈值的缓存输出（仅匹配同一模型、同一 sig 的条目）。"""
+        best_score = -1.0
+        best_output: str | None = None
+        for entry_model, entry_sig, entry_vec, output in self._load():
+            if entry_model != model or entry_sig != sig or len(entry_vec) != len(vector):
+                continue
+            score = sum(a * b for a, b in zip(vector, entry_vec))
+            if score > best_score:
+                best_score, best_output = score, output
+        if best_output is not None and best_score >= self.threshold:
+            self.hits += 1
+            logger.debug(f"语义缓存命中 score={best_score:.4f}")
+            return best_output
+        self.misses += 1
+        return None
+
+    def add(self, vector: list[float], output: str, *, model: str | None = None, sig: str | None = None) -> None:
+        ensure_dir(self.cache_dir)
+        line = json_dumps({"model": model, "sig": sig, "vector": vector, "output": output})
+        with self._file.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        self._load().append((model, sig, vector, output))
+
+    def stats(self) -> str:
+        return f"hits={self.hits} misses={self.misses}"
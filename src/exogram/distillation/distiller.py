@@ -6,14 +6,15 @@ DEPRECATED: 此模块已废弃，请使用 semantic_distiller.py 中的 Semantic
 from __future__ import annotations
 
 import warnings
-import json
+import re
 import uuid
 from datetime import datetime, timezone
+from typing import Callable
 
-from openai import APIStatusError, OpenAI
+from openai import APIStatusError, AsyncOpenAI, OpenAI
 
 from exogram.models import CognitionRecord, RawStepsDocument
-from exogram.utils import normalize_text
+from exogram.utils import json_dumps, json_loads, normalize_text
 
 # 发出废弃警告
 warnings.warn(
@@ -39,64 +40,137 @@ class Distiller:
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
-        self.client = OpenAI(
+        self._client_kwargs = dict(
             api_key=api_key,
             base_url=base_url,
             timeout=timeout,
             max_retries=max_retries,
         )
+        self.client = OpenAI(**self._client_kwargs)
+        self._async_client: AsyncOpenAI | None = None
 
-    def distill(self, *, topic: str, raw: RawStepsDocument, source_recording: str | None = None) -> CognitionRecord:
-        prompt = _build_distillation_prompt(topic=topic, raw_steps=raw.model_dump(mode="json"))
-
-        text = ""
+    def distill(
+        self,
+        *,
+        topic: str,
+        raw: RawStepsDocument,
+        source_recording: str | None = None,
+        on_delta: Callable[[str], None] | None = None,
+    ) -> CognitionRecord:
+        """流式调用 LLM 并蒸馏；on_delta 会收到每个增量文本片段（可用于实时输出）。"""
+        responses_req, chat_req = self._build_messages(topic=topic, raw=raw)
+
+        chunks: list[str] = []
         # 优先使用 Responses API（OpenAI 官方）；若兼容网关不支持 /responses，则回退到 /chat/completions
         try:
-            resp = self.client.responses.create(
-                model=self.model,
-                input=prompt,
-                temperature=self.temperature,
-                max_output_tokens=self.max_tokens,
-            )
-            text = (resp.output_text or "").strip()
+            stream = self.client.responses.create(**responses_req)
+            for event in stream:
+                if event.type == "response.output_text.delta":
+                    _collect(chunks, event.delta, on_delta)
         except APIStatusError as e:
-            if e.status_code in (404, 405):
-                cc = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=self.temperature,
-                    max_tokens=self.max_tokens,
-                )
-                text = ((cc.choices[0].message.content or "") if cc.choices else "").strip()
-            else:
+            if not _responses_unsupported(e):
                 raise
-        if not text:
-            raise RuntimeError("LLM 未返回可用文本（output_text 为空）。")
-
-        parsed = _parse_structured(text)
-
-        record = CognitionRecord(
-            id=str(uuid.uuid4()),
-            topic=topic,
-            created_at=datetime.now(timezone.utc),
-            source_recording=source_recording,
-            task_tags=parsed.get("task_tags", []),
-            key_path_features=parsed.get("key_path_features", []),
-            preference_rules=parsed.get("preference_rules", []),
-            exception_handling=parsed.get("exception_handling", []),
-            anti_patterns=parsed.get("anti_patterns", []),
-            summary=parsed.get("summary", normalize_text(text)[:8000]),
-            raw_llm_output=text,
+            stream = self.client.chat.completions.create(**chat_req)
+            for chunk in stream:
+                if chunk.choices:
+                    _collect(chunks, chunk.choices[0].delta.content, on_delta)
+
+        return _finalize(chunks, topic=topic, source_recording=source_recording)
+
+    async def distill_async(
+        self,
+        *,
+        topic: str,
+        raw: RawStepsDocument,
+        source_recording: str | None = None,
+        on_delta: Callable[[str], None] | None = None,
+    ) -> CognitionRecord:
+        """distill 的 asyncio 版本（AsyncOpenAI），便于在事件循环中与其他 I/O 并发。"""
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(**self._client_kwargs)
+        client = self._async_client
+        responses_req, chat_req = self._build_messages(topic=topic, raw=raw)
+
+        chunks: list[str] = []
+        try:
+            stream = await client.responses.create(**responses_req)
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    _collect(chunks, event.delta, on_delta)
+        except APIStatusError as e:
+            if not _responses_unsupported(e):
+                raise
+            stream = await client.chat.completions.create(**chat_req)
+            async for chunk in stream:
+                if chunk.choices:
+                    _collect(chunks, chunk.choices[0].delta.content, on_delta)
+
+        return _finalize(chunks, topic=topic, source_recording=source_recording)
+
+    def _build_messages(self, *, topic: str, raw: RawStepsDocument) -> tuple[dict, dict]:
+        """同步/异步共用：构建 prompt，返回 (Responses API 请求参数, Chat Completions 回退请求参数)。"""
+        prompt = _build_distillation_prompt(topic=topic, raw_steps=raw.model_dump(mode="json"))
+        responses_req = dict(
+            model=self.model,
+            input=prompt,
+            temperature=self.temperature,
+            max_output_tokens=self.max_tokens,
+            stream=True,
+        )
+        chat_req = dict(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True,
         )
-        return record
+        return responses_req, chat_req
 
 
-def _build_distillation_prompt(*, topic: str, raw_steps: dict) -> str:
-    """
-    强约束：不要输出代码；不要依赖 CSS selector；提炼“决策逻辑/操作策略/异常经验”。
-    """
-    raw_json = json.dumps(raw_steps, ensure_ascii=False, indent=2)
-    return f"""
+def _responses_unsupported(e: APIStatusError) -> bool:
+    """兼容网关不支持 /responses 时返回 404/405，此时回退到 /chat/completions。"""
+    return e.status_code in (404, 405)
+
+
+def _finalize(chunks: list[str], *, topic: str, source_recording: str | None) -> CognitionRecord:
+    return _build_record(
+        text="".join(chunks).strip(),
+        topic=topic,
+        source_recording=source_recording,
+    )
+
+
+def _collect(chunks: list[str], delta: str | None, on_delta: Callable[[str], None] | None) -> None:
+    if not delta:
+        return
+    chunks.append(delta)
+    if on_delta is not None:
+        on_delta(delta)
+
+
+def _build_record(*, text: str, topic: str, source_recording: str | None) -> CognitionRecord:
+    if not text:
+        raise RuntimeError("LLM 未返回可用文本（output_text 为空）。")
+
+    parsed = _parse_structured(text)
+
+    return CognitionRecord(
+        id=str(uuid.uuid4()),
+        topic=topic,
+        created_at=datetime.now(timezone.utc),
+        source_recording=source_recording,
+        task_tags=parsed.get("task_tags", []),
+        key_path_features=parsed.get("key_path_features", []),
+        preference_rules=parsed.get("preference_rules", []),
+        exception_handling=parsed.get("exception_handling", []),
+        anti_patterns=parsed.get("anti_patterns", []),
+        summary=parsed.get("summary", normalize_text(text)[:8000]),
+        raw_llm_output=text,
+    )
+
+
+# 固定的 prompt 模板：模块加载时构建一次，调用时只填充 topic / raw_json
+_PROMPT_TEMPLATE = """
 你是一名“流程复盘分析师”。下面是用户在浏览器中的操作日志（已结构化）。请你提炼可迁移的“系统认知/操作策略”，用于指导未来的智能 Agent。
 
 【重要约束】
@@ -122,16 +196,23 @@ def _build_distillation_prompt(*, topic: str, raw_steps: dict) -> str:
 """.strip()
 
 
+def _build_distillation_prompt(*, topic: str, raw_steps: dict) -> str:
+    """
+    强约束：不要输出代码；不要依赖 CSS selector；提炼“决策逻辑/操作策略/异常经验”。
+    """
+    return _PROMPT_TEMPLATE.format(topic=topic, raw_json=json_dumps(raw_steps, indent=True))
+
+
+# 首尾的 ``` / ```json 围栏（只匹配整段开头与结尾）
+_FENCE_RE = re.compile(r"\A```(?:json)?[ \t]*\n?|\n?```\s*\Z")
+
+
 def _parse_structured(text: str) -> dict:
     # 期望 LLM 直接输出 JSON；若包了一层 ```json 也容错
-    t = text.strip()
-    if t.startswith("```"):
-        t = t.strip("`")
-        # 可能是 ```json\n{...}\n```
-        t = t.replace("json\n", "", 1).strip()
+    t = _FENCE_RE.sub("", text.strip()).strip()
 
     try:
-        obj = json.loads(t)
+        obj = json_loads(t)
     except Exception:
         # 最差兜底：把全文当 summary
         return {"summary": normalize_text(text)}
@@ -5,17 +5,22 @@
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+import re
 import uuid
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, NamedTuple
+from urllib.parse import urlparse
 
 from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from pydantic import ValidationError
 
-from exogram.models import RawStepsDocument
+from exogram.distillation.cache import LLMCache, SemanticCache
+from exogram.models import RawStep, RawStepsDocument
 from exogram.models_rich import (
     KeyElement,
     MetaInfo,
@@ -25,7 +30,7 @@ from exogram.models_rich import (
     TaskInfo,
     WebsiteInfo,
 )
-from exogram.utils import get_logger
+from exogram.utils import get_logger, json_loads
 
 logger = get_logger("Distill")
 
@@ -93,6 +98,13 @@ USER_PROMPT = """请分析以下浏览器操作记录，生成完整的操作认
   "replication_guide": "如果 AI Agent 要执行类似任务，应该如何操作（3-5句话的指导）"
 }}"""
 
+# LLM 输出中的 JSON：```json {...} ``` 代码块，或退化为第一个 { 到最后一个 } 的跨度
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# prompt 模板指纹：参与缓存 key，修改模板后旧缓存自动失效
+_PROMPT_FINGERPRINT = hashlib.sha256(f"{SYSTEM_PROMPT}\0{USER_PROMPT}".encode("utf-8")).hexdigest()[:16]
+
 PROMPT = ChatPromptTemplate.from_messages([
     ("system", SYSTEM_PROMPT),
     ("user", USER_PROMPT),
@@ -101,128 +113,196 @@ PROMPT = ChatPromptTemplate.from_messages([
 
 # ========== 辅助函数 ==========
 
-def _extract_start_url(steps: list[dict]) -> str | None:
-    """从步骤中提取起始 URL（第一个 navigate 动作的 URL）"""
-    for step in steps:
-        action = step.get("action", "")
-        if action == "navigate":
-            url = step.get("url", "")
-            if url and url != "about:blank":
-                return url
-    # 备选：从 page_snapshot 中提取
-    for step in steps:
-        meta = step.get("meta", {})
-        snapshot = meta.get("page_snapshot")
-        if snapshot:
-            url = snapshot.get("url", "")
-            if url and url != "about:blank":
-                return url
-    return None
+class _PromptFields(NamedTuple):
+    """一次遍历 steps 得到的 prompt 输入字段"""
+    start_url: str | None
+    website_info: str
+    steps_summary: str
+    steps_detail: str
+    step_signature: str  # 动作序列（navigate/click/type…）的哈希，语义缓存只在流程一致时复用
 
 
-def _format_website_info(steps: list[dict]) -> str:
-    """提取网站信息"""
-    # 找第一个有 page_snapshot 的步骤
-    for step in steps:
-        meta = step.get("meta", {})
-        snapshot = meta.get("page_snapshot")
-        if snapshot:
-            title = snapshot.get("title", "未知")
-            url = snapshot.get("url", "")
-            elements = snapshot.get("interactiveElements", [])
-            
-            # 提取菜单/导航信息
-            menu_items = []
-            for elem in elements[:20]:
-                role = elem.get("role", "")
-                text = elem.get("text", "")
-                if role == "menuitem" and text and len(text) < 20:
-                    menu_items.append(text)
-            
-            lines = [
-                f"标题: {title}",
-                f"URL: {url}",
-            ]
-            if menu_items:
-                lines.append(f"主菜单: {', '.join(menu_items[:8])}")
-            return "\n".join(lines)
+# 语义缓存 embedding 文本中详细步骤的最大长度
+_SEMANTIC_DETAIL_LIMIT = 2000
+
+
+def _clip(text: str, limit: int = 50) -> str:
+    """截断过长的文本，避免单个字段撑大 prompt"""
+    if len(text) > limit:
+        return text[:limit] + "..."
+    return text
+
+
+def _format_website_info(snapshot: dict | None, first_url: str | None) -> str:
+    """提取网站信息：优先用第一个 page_snapshot，否则退化为第一个 URL"""
+    if snapshot:
+        title = snapshot.get("title", "未知")
+        url = snapshot.get("url", "")
+        elements = snapshot.get("interactiveElements", [])
+        
+        # 提取菜单/导航信息
+        menu_items = []
+        for elem in elements[:20]:
+            role = elem.get("role", "")
+            text = elem.get("text", "")
+            if role == "menuitem" and text and len(text) < 20:
+                menu_items.append(text)
+        
+        lines = [
+            f"标题: {_clip(str(title), 80)}",
+            f"URL: {url}",
+        ]
+        if menu_items:
+            lines.append(f"主菜单: {', '.join(menu_items[:8])}")
+        return "\n".join(lines)
     
-    # 没有 snapshot，从 URL 提取
-    for step in steps:
-        url = step.get("url", "")
-        if url and url != "about:blank":
-            return f"URL: {url}"
+    if first_url:
+        return f"URL: {first_url}"
     return "(无网站信息)"
 
 
-def _format_steps_summary(steps: list[dict]) -> str:
-    """生成步骤摘要"""
+def _format_step_detail(step: RawStep, action: str) -> str | None:
+    """格式化单个步骤（只处理 navigate / click / type）"""
+    idx = step.idx
+    
+    if action == "navigate":
+        return f"[{idx}] 导航到: {step.url}"
+    
+    if action == "click":
+        target = _clip(step.target_text or step.target_label or "")
+        
+        # 添加组件类型信息
+        meta = step.meta
+        comp_type = meta.get("componentType", "")
+        tree_node = meta.get("treeNode")
+        selected_option = meta.get("selectedOption")
+        
+        desc = f"[{idx}] 点击: {target}"
+        if comp_type:
+            desc += f" ({comp_type})"
+        if tree_node and tree_node.get("title"):
+            desc += f" [树节点: {_clip(str(tree_node['title']))}]"
+        if selected_option:
+            desc += f" [选择: {_clip(str(selected_option.get('value', '')))}]"
+        return desc
+    
+    if action == "type":
+        label = _clip(step.target_label or "(输入框)")
+        # 长文本（如富文本/备注）只保留开头，LLM 只需知道输入了什么内容
+        return f"[{idx}] 输入 {label}: {_clip(str(step.value), 200)}"
+    
+    return None
+
+
+def _extract_prompt_fields(steps: list[RawStep], max_steps: int = 30) -> _PromptFields:
+    """
+    单次遍历 steps，同时得到起始 URL、网站信息、步骤摘要和详细步骤。
+
+    直接读取 RawStep 属性，不对整个步骤（尤其是体积大的 page_snapshot）做 model_dump。
+
+    起始 URL 取第一个 navigate 的 URL，没有时取第一个带 URL 的 page_snapshot；
+    详细步骤只展开前 max_steps 个。
+    """
     actions = {"navigate": 0, "click": 0, "type": 0}
-    urls = set()
+    # 用 dict 去重并保持访问顺序，保证同一份录制生成的 prompt 完全一致（缓存 key 稳定）
+    urls: dict[str, None] = {}
+    nav_url: str | None = None
+    snapshot_url: str | None = None
+    first_snapshot: dict | None = None
+    first_url: str | None = None
+    detail_lines: list[str] = []
+    action_seq = hashlib.sha256()
     
-    for step in steps:
-        action = step.get("action", "")
+    for i, step in enumerate(steps):
+        action = step.action
+        url = step.url
+        action_seq.update(f"{action}\n".encode("utf-8"))
+        
         if action in actions:
             actions[action] += 1
-        url = step.get("url", "")
+        
         if url:
+            if first_url is None and url != "about:blank":
+                first_url = url
+            if nav_url is None and action == "navigate" and url != "about:blank":
+                nav_url = url
             # 提取路径部分
-            from urllib.parse import urlparse
             parsed = urlparse(url)
-            path = parsed.path or "/"
-            urls.add(f"{parsed.netloc}{path}")
+            urls[f"{parsed.netloc}{parsed.path or '/'}"] = None
+        
+        snapshot = step.meta.get("page_snapshot")
+        if snapshot:
+            if first_snapshot is None:
+                first_snapshot = snapshot
+            if snapshot_url is None:
+                s_url = snapshot.get("url", "")
+                if s_url and s_url != "about:blank":
+                    snapshot_url = s_url
+        
+        if i < max_steps:
+            line = _format_step_detail(step, action or "unknown")
+            if line is not None:
+                detail_lines.append(line)
     
-    lines = [
+    if len(steps) > max_steps:
+        detail_lines.append(f"... 还有 {len(steps) - max_steps} 个步骤")
+    
+    summary_lines = [
         f"总步骤数: {len(steps)}",
         f"页面导航: {actions['navigate']} 次",
         f"点击操作: {actions['click']} 次",
         f"输入操作: {actions['type']} 次",
         f"访问页面: {', '.join(list(urls)[:5])}",
     ]
-    return "\n".join(lines)
+    
+    return _PromptFields(
+        start_url=nav_url or snapshot_url,
+        website_info=_format_website_info(first_snapshot, first_url),
+        steps_summary="\n".join(summary_lines),
+        steps_detail="\n".join(detail_lines),
+        step_signature=action_seq.hexdigest()[:16],
+    )
 
 
-def _format_steps_detail(steps: list[dict], max_steps: int = 30) -> str:
-    """格式化详细步骤"""
-    lines = []
-    
-    for step in steps[:max_steps]:
-        idx = step.get("idx", 0)
-        action = step.get("action", "unknown")
-        
-        if action == "navigate":
-            url = step.get("url", "")
-            lines.append(f"[{idx}] 导航到: {url}")
-        
-        elif action == "click":
-            target = step.get("target_text") or step.get("target_label") or ""
-            if len(target) > 50:
-                target = target[:50] + "..."
-            
-            # 添加组件类型信息
-            meta = step.get("meta", {})
-            comp_type = meta.get("componentType", "")
-            tree_node = meta.get("treeNode")
-            selected_option = meta.get("selectedOption")
-            
-            desc = f"[{idx}] 点击: {target}"
-            if comp_type:
-                desc += f" ({comp_type})"
-            if tree_node and tree_node.get("title"):
-                desc += f" [树节点: {tree_node['title']}]"
-            if selected_option:
-                desc += f" [选择: {selected_option.get('value', '')}]"
-            lines.append(desc)
-        
-        elif action == "type":
-            label = step.get("target_label") or "(输入框)"
-            value = step.get("value", "")
-            lines.append(f"[{idx}] 输入 {label}: {value}")
+class _Prepared(NamedTuple):
+    """一次蒸馏的前处理结果：prompt 输入 + 缓存查找结果（cached_output 为 None 表示需调用 LLM）"""
+    fields: _PromptFields
+    prompt_input: dict[str, str]
+    cached_output: str | None
+    cache_key: str | None
+    semantic_vec: list[float] | None
+
+
+class _JsonObjectTracker:
+    """增量跟踪流式输出中第一个 JSON 对象的括号平衡（忽略字符串内的括号）"""
     
-    if len(steps) > max_steps:
-        lines.append(f"... 还有 {len(steps) - max_steps} 个步骤")
+    def __init__(self) -> None:
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
     
-    return "\n".join(lines)
+    def feed(self, text: str) -> bool:
+        """喂入一段文本；最外层对象闭合时返回 True"""
+        for ch in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                if self.started:
+                    self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+                self.started = True
+            elif ch == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
 
 
 # ========== 主类 ==========
@@ -237,14 +317,35 @@ class SemanticDistiller:
         base_url: str | None = None,
         model: str = "gpt-4o",
         temperature: float = 0.0,
+        max_tokens: int = 4096,
+        json_mode: bool = True,
+        cache: LLMCache | None = None,
+        semantic_cache: SemanticCache | None = None,
     ):
+        self.model = model
+        self.temperature = temperature
+        # JSON 模式：服务端保证输出是单个 JSON 对象（不支持 response_format 的模型可关闭）
+        model_kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
         self.llm = ChatOpenAI(
             model=model,
             api_key=api_key,
             base_url=base_url,
             temperature=temperature,
-            max_tokens=4096,
+            max_tokens=max_tokens,
+            model_kwargs=model_kwargs,
         )
+        # 仅在 temperature == 0（输出可复现）时启用缓存
+        self.cache = cache if temperature == 0 else None
+        self.semantic_cache = semantic_cache if temperature == 0 else None
+        # 影响 LLM 输出的一切参数都进入缓存 key（prompt 模板 / 生成参数变化时不复用旧输出）
+        self._cache_params = {
+            "prompt": _PROMPT_FINGERPRINT,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "json_mode": json_mode,
+        }
+        # 语义缓存只按 model 字段隔离条目，同样带上参数指纹
+        self._semantic_cache_model = f"{model}#{LLMCache.make_key({}, model=model, params=self._cache_params)[:16]}"
     
     def distill(
         self,
@@ -266,36 +367,196 @@ class SemanticDistiller:
             ValueError: 如果 LLM 输出无法解析为有效的 JSON
             ValidationError: 如果解析后的数据不符合 RichCognitionRecord 模型
         """
-        steps = [s.model_dump(mode="json") for s in raw.steps]
+        prepared = self._prepare(raw, verbose=verbose)
         
-        if verbose:
-            logger.info(f"分析 {len(steps)} 个操作步骤...")
+        # 调用 LLM（命中缓存则跳过）
+        raw_output = prepared.cached_output
+        if raw_output is None:
+            raw_output = (PROMPT | self.llm).invoke(prepared.prompt_input).content
         
-        # 构建 prompt 输入
-        prompt_input = {
-            "topic": raw.topic,
-            "website_info": _format_website_info(steps),
-            "steps_summary": _format_steps_summary(steps),
-            "steps_detail": _format_steps_detail(steps),
-        }
+        return self._complete(raw, prepared, raw_output, verbose=verbose)
+    
+    async def distill_async(
+        self,
+        raw: RawStepsDocument,
+        *,
+        verbose: bool = False,
+    ) -> RichCognitionRecord:
+        """
+        distill 的异步流式版本：边接收边检测 JSON 对象是否闭合，闭合后立即停止读取。
         
-        # 调用 LLM
-        chain = PROMPT | self.llm
-        response = chain.invoke(prompt_input)
-        raw_output = response.content
+        参数、返回值与异常同 distill。
+        """
+        prepared = self._prepare(raw, verbose=verbose)
         
+        raw_output = prepared.cached_output
+        if raw_output is None:
+            chunks: list[str] = []
+            tracker = _JsonObjectTracker()
+            async for chunk in (PROMPT | self.llm).astream(prepared.prompt_input):
+                chunks.append(chunk.content)
+                if tracker.feed(chunk.content):
+                    # 最外层 {...} 已闭合，后面的内容不再需要
+                    break
+            raw_output = "".join(chunks)
+        
+        return self._complete(raw, prepared, raw_output, verbose=verbose)
+    
+    async def distill_many(
+        self,
+        raws: list[RawStepsDocument],
+        *,
+        max_concurrency: int = 8,
+        verbose: bool = False,
+    ) -> list[RichCognitionRecord | Exception]:
+        """
+        批量蒸馏：命中缓存的直接复用，其余通过 chain.abatch 并发调用 LLM。
+        
+        单份失败（请求出错 / 输出无法解析）不影响其他结果，对应位置返回异常对象。
+        
+        Args:
+            raws: 原始操作步骤文档列表
+            max_concurrency: 同时进行的 LLM 请求上限
+            verbose: 是否输出详细日志
+            
+        Returns:
+            与 raws 顺序一致的列表，元素为 RichCognitionRecord 或该份失败时的异常
+        """
+        # _prepare 可能发起阻塞的 embedding 请求，放到线程中执行以免卡住事件循环
+        prepared: list[_Prepared | Exception] = await asyncio.gather(
+            *(asyncio.to_thread(self._prepare, raw) for raw in raws),
+            return_exceptions=True,
+        )
+        outputs: list[str | Exception | None] = [
+            p if isinstance(p, Exception) else p.cached_output for p in prepared
+        ]
+        
+        pending = [i for i, output in enumerate(outputs) if output is None]
         if verbose:
-            logger.info(f"LLM 返回 {len(raw_output)} 字符")
+            logger.info(f"批量蒸馏 {len(raws)} 份录制，需调用 LLM {len(pending)} 次（并发 {max_concurrency}）")
+        
+        if pending:
+            chain = PROMPT | self.llm
+            responses = await chain.abatch(
+                [prepared[i].prompt_input for i in pending],
+                config={"max_concurrency": max_concurrency},
+                return_exceptions=True,
+            )
+            for i, response in zip(pending, responses):
+                outputs[i] = response if isinstance(response, Exception) else response.content
         
-        # 解析 JSON
+        results: list[RichCognitionRecord | Exception] = []
+        for raw, p, output in zip(raws, prepared, outputs):
+            if isinstance(output, Exception):
+                result = output
+            else:
+                try:
+                    result = self._complete(raw, p, output)
+                except Exception as e:
+                    result = e
+            if isinstance(result, Exception):
+                logger.warning(f"蒸馏失败 ({raw.topic}): {result}")
+            results.append(result)
+        return results
+    
+    def distill_many_sync(
+        self,
+        raws: list[RawStepsDocument],
+        *,
+        max_concurrency: int = 8,
+        verbose: bool = False,
+    ) -> list[RichCognitionRecord | Exception]:
+        """distill_many 的同步包装"""
+        return asyncio.run(self.distill_many(raws, max_concurrency=max_concurrency, verbose=verbose))
+    
+    def _prepare(self, raw: RawStepsDocument, *, verbose: bool = False) -> _Prepared:
+        """distill / distill_async / distill_many 共用的前处理：构建 prompt 输入并查缓存"""
+        if verbose:
+            logger.info(f"分析 {len(raw.steps)} 个操作步骤...")
+        fields, prompt_input = self._build_prompt_input(raw)
+        cached_output, cache_key, semantic_vec = self._cache_lookup(raw, fields, prompt_input)
+        return _Prepared(fields, prompt_input, cached_output, cache_key, semantic_vec)
+    
+    def _complete(
+        self,
+        raw: RawStepsDocument,
+        prepared: _Prepared,
+        raw_output: str,
+        *,
+        verbose: bool = False,
+    ) -> RichCognitionRecord:
+        """共用的后处理：解析并校验，通过后才把新调用的输出回写缓存（避免缓存坏输出）"""
+        if verbose:
+            logger.info(f"LLM 返回 {len(raw_output)} 字符")
+        record = self._finalize(raw, prepared.fields, raw_output)
+        if prepared.cached_output is None:
+            self._cache_store(raw_output, prepared.cache_key, prepared.semantic_vec, prepared.fields)
+        return record
+    
+    def _build_prompt_input(self, raw: RawStepsDocument) -> tuple[_PromptFields, dict[str, str]]:
+        """构建 prompt 输入（单次遍历 steps）"""
+        fields = _extract_prompt_fields(raw.steps)
+        prompt_input = {
+            "topic": raw.topic,
+            "website_info": fields.website_info,
+            "steps_summary": fields.steps_summary,
+            "steps_detail": fields.steps_detail,
+        }
+        return fields, prompt_input
+    
+    def _cache_lookup(
+        self,
+        raw: RawStepsDocument,
+        fields: _PromptFields,
+        prompt_input: dict[str, str],
+    ) -> tuple[str | None, str | None, list[float] | None]:
+        """查缓存，返回 (命中的输出, 精确缓存 key, 语义向量)；后两者用于未命中时回写"""
+        raw_output = None
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(prompt_input, model=self.model, params=self._cache_params)
+            raw_output = self.cache.get(cache_key)
+            if raw_output is not None:
+                logger.info(f"💾 命中蒸馏缓存 ({self.cache.stats()})")
+                return raw_output, cache_key, None
+
+        # 精确缓存未命中时，再按 embedding 查近似重复的历史蒸馏：
+        # 嵌入具体步骤描述（截断），且只复用动作序列完全一致的条目，避免同站点不同流程的录制互相命中
+        semantic_vec = None
+        if self.semantic_cache is not None:
+            semantic_vec = self.semantic_cache.embed_text(
+                f"{raw.topic}\n{prompt_input['website_info']}\n{_clip(fields.steps_detail, _SEMANTIC_DETAIL_LIMIT)}"
+            )
+            raw_output = self.semantic_cache.lookup(
+                semantic_vec, model=self._semantic_cache_model, sig=fields.step_signature
+            )
+            if raw_output is not None:
+                logger.info(f"💾 命中语义缓存 ({self.semantic_cache.stats()})")
+        return raw_output, cache_key, semantic_vec
+    
+    def _cache_store(
+        self,
+        raw_output: str,
+        cache_key: str | None,
+        semantic_vec: list[float] | None,
+        fields: _PromptFields,
+    ) -> None:
+        if cache_key is not None:
+            self.cache.set(cache_key, raw_output, model=self.model)
+        if semantic_vec is not None:
+            self.semantic_cache.add(
+                semantic_vec, raw_output, model=self._semantic_cache_model, sig=fields.step_signature
+            )
+    
+    def _finalize(self, raw: RawStepsDocument, fields: _PromptFields, raw_output: str) -> RichCognitionRecord:
+        """解析 LLM 输出，补充 website.url 与 _meta 后校验为 RichCognitionRecord"""
         result = self._parse_json(raw_output)
         
         # 检查解析错误
         if "_error" in result:
             raise ValueError(f"LLM 输出解析失败: {result.get('_error')}. 原始输出: {result.get('_raw', '')[:500]}")
         
-        # 提取起始 URL
-        start_url = _extract_start_url(steps)
+        start_url = fields.start_url
         
         # 如果 LLM 没有输出 website.url，从 start_url 补充
         if "website" in result and isinstance(result["website"], dict):
@@ -308,7 +569,7 @@ class SemanticDistiller:
             "topic": raw.topic,
             "created_at": datetime.now(timezone.utc).isoformat(),
             "source": raw.source,
-            "steps_count": len(steps),
+            "steps_count": len(raw.steps),
             "start_url": start_url,
         }
         
@@ -316,30 +577,22 @@ class SemanticDistiller:
         return RichCognitionRecord.model_validate(result)
     
     def _parse_json(self, text: str) -> dict:
-        """解析 LLM 输出的 JSON"""
-        t = text.strip()
-        
-        # 提取 JSON 块
-        if "```json" in t:
-            start = t.find("```json") + 7
-            end = t.find("```", start)
-            if end > start:
-                t = t[start:end].strip()
-        elif "```" in t:
-            start = t.find("```") + 3
-            end = t.find("```", start)
-            if end > start:
-                t = t[start:end].strip()
+        """解析 LLM 输出的 JSON（JSON 模式下直接解析；否则优先取 ```json 代码块，其次取最外层 {...}）"""
+        if text.startswith("{"):
+            try:
+                return json_loads(text)
+            except json.JSONDecodeError:
+                pass
         
-        # 找 JSON 对象
-        if not t.startswith("{"):
-            start = t.find("{")
-            end = t.rfind("}") + 1
-            if start >= 0 and end > start:
-                t = t[start:end]
+        m = _JSON_FENCE_RE.search(text)
+        if m:
+            t = m.group(1)
+        else:
+            m = _JSON_OBJECT_RE.search(text)
+            t = m.group(0) if m else text.strip()
         
         try:
-            return json.loads(t)
+            return json_loads(t)
         except json.JSONDecodeError:
             return {"_error": "JSON 解析失败", "_raw": text}
 
@@ -368,10 +621,9 @@ def distill_recording(
     import os
     from pathlib import Path
     
-    # 读取录制文件
+    # 读取录制文件（pydantic-core 单次解析 + 校验，不经过中间 dict）
     path = Path(recording_path)
-    raw_obj = json.loads(path.read_text(encoding="utf-8"))
-    raw_doc = RawStepsDocument.model_validate(raw_obj)
+    raw_doc = RawStepsDocument.model_validate_json(path.read_bytes())
     
     # 创建蒸馏器
     distiller = SemanticDistiller(
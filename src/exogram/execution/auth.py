@@ -6,10 +6,12 @@
 from __future__ import annotations
 
 import json
+import os
+from functools import lru_cache
 from pathlib import Path
 from urllib.parse import urlparse
 
-from exogram.utils import get_logger
+from exogram.utils import atomic_write_text, get_logger, json_dumps, json_loads
 
 logger = get_logger("Auth")
 
@@ -22,6 +24,9 @@ CDP_AUTH_CACHE_DIR = DEFAULT_AUTH_DIR / ".cdp"
 # CDP 不支持的 cookie 字段（需要清理）
 CDP_INCOMPATIBLE_COOKIE_FIELDS = {"partitionKey", "_crHasCrossSiteAncestor"}
 
+# (源文件路径, mtime_ns) -> CDP 兼容缓存文件路径
+_CDP_FILE_CACHE: dict[tuple[str, int], str] = {}
+
 
 def get_auth_file_path(url: str, auth_dir: Path | None = None) -> Path | None:
     """
@@ -46,41 +51,61 @@ def get_auth_file_path(url: str, auth_dir: Path | None = None) -> Path | None:
         return None
     
     auth_dir = auth_dir or DEFAULT_AUTH_DIR
-    if not auth_dir.exists():
-        return None
-    
-    # 提取域名
-    parsed = urlparse(url)
-    domain = parsed.netloc
+    domain = _netloc(url)
     if not domain:
         return None
     
-    # 尝试多种可能的文件名（按优先级排序）
-    candidates = []
-    
+    try:
+        return _resolve_auth_file(domain, auth_dir, os.stat(auth_dir).st_mtime_ns)
+    except OSError:
+        return None
+
+
+@lru_cache(maxsize=256)
+def _netloc(url: str) -> str:
+    return urlparse(url).netloc
+
+
+def _is_auth_file(name: str) -> bool:
+    """目录扫描时的认证文件判定：*.json，且排除以 . 开头的隐藏/临时文件。"""
+    return name.endswith(".json") and not name.startswith(".")
+
+
+@lru_cache(maxsize=256)
+def _resolve_auth_file(domain: str, auth_dir: Path, dir_mtime_ns: int) -> Path | None:
+    """按域名在 auth_dir 中查找认证文件。
+
+    以目录 mtime 作为缓存版本：增删/重命名认证文件都会改变它，重复查找只需一次 stat。
+    """
     # 1. 完整域名（最高优先级）
-    exact_match = auth_dir / f"{domain}.json"
-    if exact_match.exists():
-        candidates.append(exact_match)
+    exact = auth_dir / f"{domain}.json"
+    if os.path.exists(exact):
+        return exact
     
-    # 2. 基础域名
     parts = domain.split(".")
-    if len(parts) > 2:
-        base_domain = ".".join(parts[-2:])
-        base_match = auth_dir / f"{base_domain}.json"
-        if base_match.exists():
-            candidates.append(base_match)
+    if len(parts) <= 2:
+        return None
+    base = ".".join(parts[-2:])
     
-    # 3. 同组织的其他域名 (如 sso2.hellobike.cn)
-    if auth_dir.exists() and len(parts) > 2:
-        base = ".".join(parts[-2:])
-        for f in auth_dir.glob("*.json"):
-            fname = f.stem
-            if base in fname and f not in candidates:
-                candidates.append(f)
+    # 2. 基础域名
+    base_match = auth_dir / f"{base}.json"
+    if os.path.exists(base_match):
+        return base_match
     
-    # 返回第一个存在的文件
-    return candidates[0] if candidates else None
+    # 3. 同组织的其他域名 (如 sso2.hellobike.cn)：前两步都未命中时才扫描目录
+    with os.scandir(auth_dir) as it:
+        for entry in it:
+            name = entry.name
+            if _is_auth_file(name) and base in name[:-5]:
+                return auth_dir / name
+    return None
+
+
+def clear_auth_path_cache() -> None:
+    """清空认证文件查找缓存（目录 mtime 精度不足的文件系统上，写入认证文件后可手动调用）"""
+    _netloc.cache_clear()
+    _resolve_auth_file.cache_clear()
+    _scan_auth_domains.cache_clear()
 
 
 def load_storage_state(url: str, auth_dir: Path | None = None) -> dict | None:
@@ -99,9 +124,7 @@ def load_storage_state(url: str, auth_dir: Path | None = None) -> dict | None:
         return None
     
     try:
-        content = auth_file.read_text(encoding="utf-8")
-        state = json.loads(content)
-        return state
+        return json_loads(auth_file.read_bytes())
     except (json.JSONDecodeError, IOError) as e:
         logger.warning(f"加载认证状态失败: {e}")
         return None
@@ -115,18 +138,28 @@ def list_available_auth_domains(auth_dir: Path | None = None) -> list[str]:
         域名列表
     """
     auth_dir = auth_dir or DEFAULT_AUTH_DIR
-    if not auth_dir.exists():
+    try:
+        return list(_scan_auth_domains(auth_dir, os.stat(auth_dir).st_mtime_ns))
+    except OSError:
         return []
-    
-    domains = []
-    for f in auth_dir.glob("*.json"):
-        domains.append(f.stem)
-    return domains
+
+
+@lru_cache(maxsize=32)
+def _scan_auth_domains(auth_dir: Path, dir_mtime_ns: int) -> tuple[str, ...]:
+    """与 _resolve_auth_file 相同，以目录 mtime 作为缓存版本，并用同一个 _is_auth_file 过滤隐藏文件"""
+    with os.scandir(auth_dir) as it:
+        return tuple(
+            entry.name[:-5]
+            for entry in it
+            if _is_auth_file(entry.name)
+        )
 
 
 def _clean_cookie_for_cdp(cookie: dict) -> dict:
-    """清理 cookie 中 CDP 不支持的字段"""
-    return {k: v for k, v in cookie.items() if k not in CDP_INCOMPATIBLE_COOKIE_FIELDS}
+    """原地删除 cookie 中 CDP 不支持的字段并返回该 cookie（不复制 dict）"""
+    for field in CDP_INCOMPATIBLE_COOKIE_FIELDS:
+        cookie.pop(field, None)
+    return cookie
 
 
 def get_cdp_compatible_auth_file(url: str, auth_dir: Path | None = None) -> str | None:
@@ -158,23 +191,31 @@ def get_cdp_compatible_auth_file(url: str, auth_dir: Path | None = None) -> str
     cache_file = cache_dir / auth_file.name
     
     try:
-        # 检查缓存是否有效（存在且比源文件新）
-        if cache_file.exists():
-            if cache_file.stat().st_mtime >= auth_file.stat().st_mtime:
-                return str(cache_file)
+        auth_mtime_ns = auth_file.stat().st_mtime_ns
+        
+        # 进程内缓存：同一源文件（路径 + mtime）只处理一次
+        key = (str(auth_file), auth_mtime_ns)
+        cached = _CDP_FILE_CACHE.get(key)
+        if cached is not None and os.path.exists(cached):
+            return cached
+        
+        # 检查磁盘缓存是否有效（存在且比源文件新）
+        if cache_file.exists() and cache_file.stat().st_mtime_ns >= auth_mtime_ns:
+            _CDP_FILE_CACHE[key] = str(cache_file)
+            return str(cache_file)
         
         # 读取并清理认证状态
-        content = auth_file.read_text(encoding="utf-8")
-        state = json.loads(content)
+        state = json_loads(auth_file.read_bytes())
         
-        # 清理 cookies 中的不兼容字段
-        if "cookies" in state:
-            state["cookies"] = [_clean_cookie_for_cdp(c) for c in state["cookies"]]
+        # 清理 cookies 中的不兼容字段（刚解析出的 dict，直接原地修改）
+        for cookie in state.get("cookies", ()):
+            _clean_cookie_for_cdp(cookie)
         
-        # 保存到缓存文件
+        # 保存到缓存文件（只给浏览器读取，不需要缩进）
         cache_dir.mkdir(parents=True, exist_ok=True)
-        cache_file.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        atomic_write_text(cache_file, json_dumps(state))
         
+        _CDP_FILE_CACHE[key] = str(cache_file)
         return str(cache_file)
         
     except (json.JSONDecodeError, IOError) as e:
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 from exogram.models_rich import RichCognitionRecord
 
 SAFE_MODE_INSTRUCTION = (
@@ -22,20 +24,25 @@ def build_agent_task(
     safe_mode: bool = True,
 ) -> str:
     """将用户任务、认知指导、起始 URL、安全模式指令拼装为最终 Agent 任务字符串。"""
-    parts: list[str] = []
+    prefix, suffix = _task_affixes(wisdom, start_url, safe_mode)
+    return prefix + task.strip() + suffix
+
 
-    if start_url:
-        parts.append(f"首先打开网址: {start_url}")
+@lru_cache(maxsize=16)
+def _task_affixes(wisdom: str, start_url: str | None, safe_mode: bool) -> tuple[str, str]:
+    """任务前后固定的部分（起始 URL / 认知指导 / 安全模式）；交互会话中多轮不变，只拼装一次。"""
+    prefix = f"首先打开网址: {start_url}\n\n" if start_url else ""
 
-    parts.append(task.strip())
+    tail: list[str] = []
 
     if wisdom:
-        parts.append(f"\n【认知指导】\n{wisdom}")
+        tail.append(f"\n【认知指导】\n{wisdom}")
 
     if safe_mode:
-        parts.append(SAFE_MODE_INSTRUCTION)
+        tail.append(SAFE_MODE_INSTRUCTION)
 
-    return "\n\n".join(parts)
+    suffix = "".join("\n\n" + part for part in tail)
+    return prefix, suffix
 
 
 class CognitiveContextManager:
@@ -46,11 +53,19 @@ class CognitiveContextManager:
 
     def __init__(self, record: RichCognitionRecord) -> None:
         self.record = record
+        self._instruction: str | None = None
 
     def build_system_instruction(self) -> str:
         """
         构建注入到 Agent 的系统级指令（长期记忆/锦囊妙计）。
+
+        结果缓存在实例上：同一 record 驱动多次执行时只拼装一次。
         """
+        if self._instruction is None:
+            self._instruction = self._render_instruction()
+        return self._instruction
+
+    def _render_instruction(self) -> str:
         parts: list[str] = []
 
         parts.append(f"【任务背景】\n你正在操作 {self.record.website.name} ({self.record.website.type})。")
@@ -59,8 +74,10 @@ class CognitiveContextManager:
 
         if self.record.key_elements:
             parts.append("【已知关键 UI 元素】")
-            for elem in self.record.key_elements:
-                parts.append(f"- [{elem.type}] {elem.name}: {elem.usage}")
+            parts.extend(
+                "- [" + elem.type + "] " + elem.name + ": " + elem.usage
+                for elem in self.record.key_elements
+            )
             parts.append("")
 
         knowledge = self.record.operation_knowledge
@@ -69,12 +86,10 @@ class CognitiveContextManager:
             knowledge_parts.append(f"导航模式: {knowledge.navigation_pattern}")
         if knowledge.form_filling_tips:
             knowledge_parts.append("表单填写技巧:")
-            for tip in knowledge.form_filling_tips:
-                knowledge_parts.append(f"- {tip}")
+            knowledge_parts.extend("- " + tip for tip in knowledge.form_filling_tips)
         if knowledge.precautions:
             knowledge_parts.append("注意事项 (Precautions):")
-            for warn in knowledge.precautions:
-                knowledge_parts.append(f"- ⚠️ {warn}")
+            knowledge_parts.extend("- ⚠️ " + warn for warn in knowledge.precautions)
 
         if knowledge_parts:
             parts.append("【操作锦囊 (SOP)】")
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
+import logging
 import os
 import time
 from dataclasses import dataclass
+from functools import lru_cache
 
 try:
     from browser_use import Agent, Browser
@@ -14,24 +17,91 @@ except ImportError:
     ChatOpenAI = None
 
 from exogram.execution.auth import get_cdp_compatible_auth_file
-from exogram.execution.context import build_agent_task
+from exogram.execution.context import SAFE_MODE_INSTRUCTION, build_agent_task
 from exogram.utils import get_logger
 
 logger = get_logger("Executor")
 
 DEBUG_TIMING = os.getenv("EXOGRAM_DEBUG_TIMING", "0") == "1"
 FLASH_MODE = os.getenv("EXOGRAM_FLASH_MODE", "0") == "1"
+FAST_MODE = os.getenv("EXOGRAM_FAST_MODE", "0") == "1"
 
 
-def _log_timing(label: str, start: float) -> None:
-    elapsed = time.time() - start
-    logger.info(f"⏱️ {label}: {elapsed:.2f}s")
+_runner: asyncio.Runner | None = None
+
 
+def run_blocking(coro):
+    """在进程内复用的事件循环上同步执行协程（替代每次新建/销毁循环的 asyncio.run）。"""
+    global _runner
+    if _runner is None:
+        _runner = asyncio.Runner()
+        atexit.register(_runner.close)
+    return _runner.run(coro)
 
-@dataclass(frozen=True)
+
+def _log_timing(label: str, start: float) -> None:
+    logger.info("⏱️ %s: %.2fs", label, time.perf_counter() - start)
+
+
+@lru_cache(maxsize=8)
+def _make_llm(
+    model: str,
+    api_key: str | None,
+    base_url: str | None,
+    timeout: float,
+    max_retries: int,
+    temperature: float,
+    max_completion_tokens: int,
+) -> ChatOpenAI:
+    """按配置复用 ChatOpenAI（及其 HTTP 连接池），多个 Executor 配置相同时共享同一客户端。"""
+    is_deepseek = base_url and "deepseek.com" in base_url
+    return ChatOpenAI(
+        model=model,
+        api_key=api_key,
+        base_url=base_url,
+        timeout=timeout,
+        max_retries=max_retries,
+        temperature=temperature,
+        max_completion_tokens=max_completion_tokens,
+        dont_force_structured_output=bool(is_deepseek),
+        add_schema_to_system_prompt=bool(is_deepseek),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class HistorySummary:
+    """从 AgentHistoryList 提取的轻量摘要（不含截图等大对象）"""
+    steps: int
+    is_done: bool
+    is_successful: bool | None
+    final_url: str | None
+    final_result: str | None
+
+
+def _summarize_history(history) -> HistorySummary:
+    final_url = next((u for u in reversed(history.urls()) if u), None)
+    return HistorySummary(
+        steps=history.number_of_steps(),
+        is_done=history.is_done(),
+        is_successful=history.is_successful(),
+        final_url=final_url,
+        final_result=history.final_result(),
+    )
+
+
+@dataclass(slots=True)
 class RunResult:
+    """单次执行结果。
+
+    history 是完整的 AgentHistoryList（长任务会带上百步截图），
+    调用方取完需要的数据后应调用 release_history()，批量执行时才不会一直占着内存。
+    """
     injected_wisdom: str
-    history: object
+    summary: HistorySummary
+    history: object | None = None
+
+    def release_history(self) -> None:
+        self.history = None
 
 
 class Executor:
@@ -52,15 +122,17 @@ class Executor:
         temperature: float,
         max_completion_tokens: int,
         start_url: str | None = None,
+        fast_mode: bool = FAST_MODE,
     ) -> None:
         self.model = model
-        self.openai_api_key = openai_api_key
+        self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
         self.openai_base_url = openai_base_url
         self.openai_timeout = openai_timeout
         self.openai_max_retries = openai_max_retries
         self.temperature = temperature
         self.max_completion_tokens = max_completion_tokens
         self.start_url = start_url
+        self.fast_mode = fast_mode
 
         self._browser: Browser | None = None
         self._llm: ChatOpenAI | None = None
@@ -69,7 +141,7 @@ class Executor:
     # 懒加载 Browser / LLM（整个交互会话中只创建一次）
     # ------------------------------------------------------------------
 
-    def _ensure_browser(self) -> Browser:
+    async def _ensure_browser(self) -> Browser:
         if self._browser is not None:
             return self._browser
 
@@ -80,19 +152,25 @@ class Executor:
             "keep_alive": True,
         }
 
-        if DEBUG_TIMING:
+        if self.fast_mode:
+            browser_kwargs["minimum_wait_page_load_time"] = 0.05
+            browser_kwargs["wait_for_network_idle_page_load_time"] = 0.2
+            browser_kwargs["wait_between_actions"] = 0.1
+            logger.info("🚀 快速模式：已缩短页面加载与操作间等待")
+        elif DEBUG_TIMING:
             browser_kwargs["minimum_wait_page_load_time"] = 0.1
             browser_kwargs["wait_for_network_idle_page_load_time"] = 0.3
             browser_kwargs["wait_between_actions"] = 0.3
             logger.info("🔧 调试模式：已减少等待时间")
 
         if self.start_url:
-            auth_file = get_cdp_compatible_auth_file(self.start_url)
+            # 认证文件的读取/清理/落盘是阻塞 I/O，放到线程里避免卡住事件循环
+            auth_file = await asyncio.to_thread(get_cdp_compatible_auth_file, self.start_url)
             if auth_file:
                 browser_kwargs["storage_state"] = auth_file
                 logger.info("已加载认证状态")
 
-        t0 = time.time()
+        t0 = time.perf_counter()
         self._browser = Browser(**browser_kwargs)
         if DEBUG_TIMING:
             _log_timing("Browser 对象创建", t0)
@@ -103,17 +181,14 @@ class Executor:
         if self._llm is not None:
             return self._llm
 
-        is_deepseek = self.openai_base_url and "deepseek.com" in self.openai_base_url
-        self._llm = ChatOpenAI(
-            model=self.model,
-            api_key=self.openai_api_key or os.getenv("OPENAI_API_KEY"),
-            base_url=self.openai_base_url,
-            timeout=self.openai_timeout,
-            max_retries=self.openai_max_retries,
-            temperature=self.temperature,
-            max_completion_tokens=self.max_completion_tokens,
-            dont_force_structured_output=bool(is_deepseek),
-            add_schema_to_system_prompt=bool(is_deepseek),
+        self._llm = _make_llm(
+            self.model,
+            self.openai_api_key,
+            self.openai_base_url,
+            self.openai_timeout,
+            self.openai_max_retries,
+            self.temperature,
+            self.max_completion_tokens,
         )
         return self._llm
 
@@ -129,19 +204,29 @@ class Executor:
         navigate_to_start: bool = True,
         safe_mode: bool = True,
     ) -> RunResult:
-        total_start = time.time()
+        total_start = time.perf_counter()
 
         full_task = build_agent_task(
             task=task,
             wisdom=wisdom,
             start_url=self.start_url if navigate_to_start else None,
-            safe_mode=safe_mode,
+            # 安全模式指令放进系统提示（见下方 extend_system_message），不再拼进每轮任务
+            safe_mode=False,
         )
 
-        browser = self._ensure_browser()
-        llm = self._ensure_llm()
+        if self._browser is not None and self._llm is not None:
+            browser, llm = self._browser, self._llm
+        else:
+            # 首次执行：浏览器准备（含认证文件 I/O）与 LLM 客户端创建互不依赖，并发进行
+            browser, llm = await asyncio.gather(
+                self._ensure_browser(),
+                asyncio.to_thread(self._ensure_llm),
+            )
 
         agent_kwargs: dict = {"task": full_task, "llm": llm, "browser": browser}
+        if safe_mode:
+            # 系统提示在多轮之间保持不变，支持前缀缓存的服务（如 OpenAI 自动 prompt caching）可复用
+            agent_kwargs["extend_system_message"] = SAFE_MODE_INSTRUCTION.strip()
         if FLASH_MODE:
             agent_kwargs["flash_mode"] = True
             agent_kwargs["max_history_items"] = 10
@@ -151,26 +236,72 @@ class Executor:
         agent = Agent(**agent_kwargs)
 
         step_count = 0
-        step_start_time = time.time()
+        step_start_time = time.perf_counter()
+        # 单步计时只在调试模式且 INFO 可输出时开启，Flash 模式高频回调下不做多余工作
+        timing = DEBUG_TIMING and logger.isEnabledFor(logging.INFO)
 
         async def on_step_start(agent_instance):
             nonlocal step_start_time
-            step_start_time = time.time()
+            if timing:
+                step_start_time = time.perf_counter()
 
         async def on_step_end(agent_instance):
-            nonlocal step_count, step_start_time
+            nonlocal step_count
             step_count += 1
-            if DEBUG_TIMING:
-                logger.info(f"⏱️ Step {step_count} 耗时: {time.time() - step_start_time:.2f}s")
+            if timing:
+                logger.info("⏱️ Step %d 耗时: %.2fs", step_count, time.perf_counter() - step_start_time)
 
         logger.info("🚀 Agent 开始执行...")
         history = await agent.run(on_step_start=on_step_start, on_step_end=on_step_end)
 
         if DEBUG_TIMING:
             _log_timing("Agent.run() 总耗时", total_start)
-            logger.info(f"📊 总步数: {step_count}")
+            logger.info("📊 总步数: %d", step_count)
 
-        return RunResult(injected_wisdom=wisdom, history=history)
+        return RunResult(
+            injected_wisdom=wisdom,
+            summary=_summarize_history(history),
+            history=history,
+        )
+
+    async def run_batch(
+        self,
+        tasks: list[str],
+        *,
+        wisdom: str = "",
+        safe_mode: bool = True,
+        keep_history: bool = False,
+    ) -> list[RunResult]:
+        """依次执行多个任务，共享同一个 Browser / LLM 客户端（只在第一个任务时创建）。
+
+        不并发：所有 Agent 操作的是同一个浏览器会话，并发会互相抢占页面。
+        每个任务都从 start_url 开始，彼此不依赖上一个任务停留的页面。
+        默认只保留摘要，完整 history 需显式传 keep_history=True。
+        """
+        results: list[RunResult] = []
+        for task in tasks:
+            result = await self.run(task=task, wisdom=wisdom, navigate_to_start=True, safe_mode=safe_mode)
+            if not keep_history:
+                result.release_history()
+            results.append(result)
+        return results
+
+    async def keep_warm(self, interval: float = 5.0) -> None:
+        """等待用户输入期间定期对当前页面做一次空 evaluate，避免渲染进程进入后台节流。
+
+        由调用方以 task 方式启动并在输入返回后 cancel。
+        """
+        while True:
+            await asyncio.sleep(interval)
+            if self._browser is None:
+                continue
+            try:
+                page = await self._browser.get_current_page()
+                if page is not None:
+                    await page.evaluate("() => 0")
+            except Exception as e:
+                # 保活失败不影响后续任务（页面可能正在被用户手动操作/跳转）
+                logger.debug(f"页面保活失败: {e}")
 
     # ------------------------------------------------------------------
     # 生命周期
@@ -188,4 +319,4 @@ class Executor:
                 return await self.run(task=task, wisdom=wisdom, safe_mode=False)
             finally:
                 await self.close()
-        return asyncio.run(_run_and_close())
+        return run_blocking(_run_and_close())
@@ -2,7 +2,12 @@ from __future__ import annotations
 
 import asyncio
 
-from exogram.execution.executor import Executor
+try:
+    import readline  # noqa: F401  # 为 input() 提供行编辑与多轮任务的历史记录（Windows 上不可用）
+except ImportError:
+    readline = None
+
+from exogram.execution.executor import Executor, run_blocking
 from exogram.utils import get_logger
 
 logger = get_logger("Session")
@@ -32,7 +37,7 @@ class InteractiveSession:
 
     def start(self, initial_task: str) -> None:
         """同步入口：执行首个任务并进入交互循环。"""
-        asyncio.run(self._loop(initial_task))
+        run_blocking(self._loop(initial_task))
 
     # ------------------------------------------------------------------
     # 内部实现
@@ -40,25 +45,26 @@ class InteractiveSession:
 
     async def _loop(self, initial_task: str) -> None:
         try:
-            await self._executor.run(
+            result = await self._executor.run(
                 task=initial_task,
                 wisdom=self._wisdom,
                 navigate_to_start=True,
                 safe_mode=self._safe_mode,
             )
+            result.release_history()
         except Exception as e:
             logger.error(f"❌ 任务执行出错: {e}")
 
         _print_banner()
 
-        loop = asyncio.get_running_loop()
         while True:
+            keepalive = asyncio.create_task(self._executor.keep_warm())
             try:
-                user_input: str = await loop.run_in_executor(
-                    None, input, "📝 请输入新任务 (quit 退出): ",
-                )
+                user_input: str = await asyncio.to_thread(input, "📝 请输入新任务 (quit 退出): ")
             except (EOFError, KeyboardInterrupt):
                 break
+            finally:
+                keepalive.cancel()
 
             user_input = user_input.strip()
             if not user_input:
@@ -68,12 +74,13 @@ class InteractiveSession:
 
             logger.info("📡 正在获取当前页面状态…")
             try:
-                await self._executor.run(
+                result = await self._executor.run(
                     task=user_input,
                     wisdom=self._wisdom,
                     navigate_to_start=False,
                     safe_mode=self._safe_mode,
                 )
+                result.release_history()
                 print("\n✅ 任务执行完成！继续输入新任务或 quit 退出。\n")
             except Exception as e:
                 logger.error(f"❌ 任务执行出错: {e}")
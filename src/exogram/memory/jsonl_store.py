@@ -1,89 +1,321 @@
 from __future__ import annotations
 
-import json
+import bisect
+import heapq
 import math
 import re
+import sys
+import time
+from collections import Counter
 from datetime import datetime, timezone
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
+from typing import BinaryIO, Iterable
 
 from exogram.models import CognitionRecord, RetrievalHit
-from exogram.utils import ensure_dir, normalize_text
+from exogram.utils import ensure_dir, get_logger, json_dumps, normalize_text
+
+logger = get_logger("Memory")
 
 
 class JsonlMemoryStore:
     def __init__(self, path: Path) -> None:
         self.path = path
         ensure_dir(self.path.parent)
-        if not self.path.exists():
-            self.path.write_text("", encoding="utf-8")
+        # touch 一次完成"不存在则创建"，没有 exists -> write 之间的竞态
+        self.path.touch(exist_ok=True)
+        self._cache: tuple[tuple[int, int], _MemoryIndex] | None = None
+        self._fh: BinaryIO | None = None
+
+    def __enter__(self) -> JsonlMemoryStore:
+        """`with store:` 期间保持一个追加句柄，多次 append 不再反复 open/close。"""
+        if self._fh is None:
+            self._fh = self.path.open("ab")
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        fh, self._fh = self._fh, None
+        if fh is not None:
+            fh.close()
+
+    def _write(self, lines: list[bytes]) -> None:
+        data = b"".join(lines)
+        if self._fh is not None:
+            self._fh.write(data)
+            # 立即 flush：读取/索引依赖文件大小判断是否与缓存一致
+            self._fh.flush()
+        else:
+            with self.path.open("ab") as f:
+                f.write(data)
 
     def append(self, record: CognitionRecord) -> None:
-        line = record.model_dump_json(ensure_ascii=False)
-        with self.path.open("a", encoding="utf-8") as f:
-            f.write(line + "\n")
+        self.append_many([record])
+
+    def append_many(self, records: Iterable[CognitionRecord]) -> int:
+        """批量追加：拼成一块 bytes 一次写入；返回写入条数。"""
+        records = list(records)
+        # model_dump_json 由 pydantic-core 直接序列化（非 ASCII 原样保留），不经过中间 dict
+        lines = [r.model_dump_json().encode("utf-8") + b"\n" for r in records]
+        if lines:
+            before = self._stat_version()
+            self._write(lines)
+            # 追加前缓存与文件一致、且追加后只多了本次写入的字节：增量更新索引，不必整体重建
+            cache = self._cache
+            after = self._stat_version()
+            if (
+                cache is not None
+                and before == cache[0]
+                and after is not None
+                and after[1] == before[1] + sum(map(len, lines))
+            ):
+                for r in records:
+                    cache[1].add(r)
+                self._cache = (after, cache[1])
+        return len(lines)
+
+    def append_raw_many(self, rows: Iterable[dict]) -> int:
+        """批量追加已按 CognitionRecord 字段投影好的 dict（跳过 pydantic 校验，只做必填字段/类型的廉价检查）。
+
+        任一行不合法时抛 ValueError 且整批不写入，避免写进 _load 会丢弃的行。
+        """
+        rows = list(rows)
+        for row in rows:
+            problem = _check_raw_row(row)
+            if problem:
+                raise ValueError(f"记录 {row.get('id')!r} ({row.get('topic')!r}) 不合法: {problem}")
+        lines = [json_dumps(row).encode("utf-8") + b"\n" for row in rows]
+        if lines:
+            self._write(lines)
+        return len(lines)
 
     def list_all(self) -> list[CognitionRecord]:
-        if not self.path.exists():
-            return []
-        records: list[CognitionRecord] = []
-        for line in self.path.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                obj = json.loads(line)
-                records.append(CognitionRecord.model_validate(obj))
-            except Exception:
-                # 允许坏行存在（手工编辑/旧版本）
-                continue
-        return records
+        return list(self._load().records)
+
+    def _stat_version(self) -> tuple[int, int] | None:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self) -> _MemoryIndex:
+        """解析后的记录及检索索引；按文件 (mtime, size) 缓存，文件未变时不重复读取与校验。"""
+        version = self._stat_version()
+        if version is None:
+            return _MemoryIndex()
+        if self._cache is not None and self._cache[0] == version:
+            return self._cache[1]
+
+        index = _MemoryIndex()
+        dropped: list[int] = []
+        # 逐行流式读取 bytes：峰值内存只与最长一行相关（首尾空白由 JSON 解析自行忽略）
+        with self.path.open("rb") as f:
+            for lineno, line in enumerate(f, 1):
+                if line.isspace():
+                    continue
+                try:
+                    # bytes 直接交给 pydantic-core：JSON 解析与校验一次完成
+                    record = CognitionRecord.model_validate_json(line)
+                except Exception:
+                    # 允许坏行存在（手工编辑/旧版本），但要让用户知道有记录被跳过
+                    dropped.append(lineno)
+                    continue
+                index.add(record)
+        if dropped:
+            logger.warning(f"{self.path} 中有 {len(dropped)} 行无法解析，已跳过（行号: {dropped[:10]}）")
+        self._cache = (version, index)
+        return index
 
     def retrieve(self, *, topic: str | None, query: str, limit: int = 5) -> list[RetrievalHit]:
-        records = self.list_all()
-        hits: list[RetrievalHit] = []
-        for r in records:
-            if topic and r.topic != topic:
+        tokens = _query_tokens(query)
+        if not tokens:
+            return []
+        index = self._load()
+        now = time.time()
+
+        if topic:
+            # 指定 topic 时只看该 topic 下的记录：df / avgdl 按该 topic 统计，直接做子串匹配
+            ids = index.by_topic.get(topic, [])
+            scores = index.bm25_scores(tokens, ids)
+            fill_order = sorted((-index.base[i], i) for i in ids if i not in scores)
+        else:
+            # df 直接取倒排索引的命中集合大小
+            scores = index.bm25_scores(tokens)
+            fill_order = index.by_base
+
+        # 只对命中记录计算新近性；nlargest 与稳定排序后截断等价，只为前 limit 条构造 RetrievalHit
+        # （字段均为内部算出的 CognitionRecord / float，用 model_construct 跳过校验）
+        make_hit = RetrievalHit.model_construct
+        created, base = index.created, index.base
+        matched = [
+            (i, _combine_score(score, created[i], now, base[i]))
+            for i, score in sorted(scores.items())
+        ]
+        hits = [
+            make_hit(record=index.records[i], score=score)
+            for i, score in heapq.nlargest(limit, matched, key=itemgetter(1))
+        ]
+
+        # 未命中任何 token 的记录得分只剩与查询无关的长度项，排在命中记录之后，按预排序补足
+        for _, i in fill_order:
+            if len(hits) >= limit:
+                break
+            if i in scores:
                 continue
-            score = _score_record(r, query=query)
-            if score <= 0:
+            hits.append(make_hit(record=index.records[i], score=index.base[i]))
+        return hits
+
+
+class _MemoryIndex:
+    """
+    记录 + 小写检索文本 + 字符 1/2-gram 倒排索引 + 按 topic 分组的记录序号（另记检索文本总长，用于 BM25 的 avgdl）。
+
+    posting 为 {记录序号: gram 出现次数}，入库时一次算好。长度 <= 2 的 token（中文 2-gram 查询的全部 token）
+    本身就是 gram，posting 即精确命中集合及词频，检索时只做字典查找；
+    更长的 token 按其各 2-gram 求交得到候选，再在候选记录上数出现次数。
+    """
+
+    def __init__(self) -> None:
+        self.records: list[CognitionRecord] = []
+        self.blobs: list[str] = []
+        self.base: list[float] = []
+        self.created: list[float] = []
+        self.postings: dict[str, dict[int, int]] = {}
+        # (-长度项得分, 序号)：未命中记录的最终排序
+        self.by_base: list[tuple[float, int]] = []
+        self.by_topic: dict[str, list[int]] = {}
+        self.total_len = 0
+
+    def add(self, record: CognitionRecord) -> None:
+        i = len(self.records)
+        blob = _record_blob(record)
+        base = _length_score(blob)
+        self.records.append(record)
+        self.blobs.append(blob)
+        self.total_len += len(blob)
+        self.base.append(base)
+        self.created.append(_created_epoch(record))
+        grams = Counter(blob)
+        grams.update(blob[j : j + 2] for j in range(len(blob) - 1))
+        for g, tf in grams.items():
+            self.postings.setdefault(g, {})[i] = tf
+        bisect.insort(self.by_base, (-base, i))
+        # 同一 topic 的记录共享同一个字符串对象（topic 种类很少，逐行解析出的副本可以直接丢掉）
+        topic = sys.intern(record.topic)
+        if topic is not record.topic:
+            record.topic = topic
+        self.by_topic.setdefault(topic, []).append(i)
+
+    def bm25_scores(self, tokens: tuple[str, ...], ids: list[int] | None = None) -> dict[int, float]:
+        """
+        BM25 得分（只包含命中 >= 1 个 token 的记录）。
+
+        ids 为 None 时在全库上计算；否则只在该记录子集上计算，df / avgdl 也按子集统计。
+        """
+        blobs = self.blobs
+        if ids is None:
+            n_docs = len(self.records)
+            total_len = self.total_len
+        else:
+            n_docs = len(ids)
+            total_len = sum(len(blobs[i]) for i in ids)
+        if not n_docs:
+            return {}
+        avgdl = total_len / n_docs
+        scores: dict[int, float] = {}
+        for t in tokens:
+            tfs = self._term_freqs(t, ids)
+            if not tfs:
                 continue
-            hits.append(RetrievalHit(record=r, score=score))
+            idf = _bm25_idf(len(tfs), n_docs)
+            for i, tf in tfs.items():
+                scores[i] = scores.get(i, 0.0) + idf * _bm25_tf(tf, len(blobs[i]), avgdl)
+        return scores
 
-        hits.sort(key=lambda h: h.score, reverse=True)
-        return hits[:limit]
+    def _term_freqs(self, token: str, ids: list[int] | None) -> dict[int, int]:
+        """{记录序号: token 出现次数}，只包含出现过的记录"""
+        if len(token) <= 2:
+            posting = self.postings.get(token, {})
+            if ids is None:
+                return posting
+            return {i: posting[i] for i in ids if i in posting}
+        blobs = self.blobs
+        candidates = self._candidates(token)
+        if ids is not None:
+            candidates.intersection_update(ids)
+        return {i: tf for i in sorted(candidates) if (tf := _count_overlapping(blobs[i], token))}
 
+    def _candidates(self, token: str) -> set[int]:
+        ids: set[int] | None = None
+        for j in range(len(token) - 1):
+            posting = self.postings.get(token[j : j + 2])
+            if not posting:
+                return set()
+            ids = set(posting) if ids is None else ids.intersection(posting)
+            if not ids:
+                return set()
+        return ids or set()
 
-_NON_WORD = re.compile(r"[^\w\u4e00-\u9fff]+", re.UNICODE)
+
+_WORD_RE = re.compile(r"[\w\u4e00-\u9fff]+", re.UNICODE)
+# 纯 ASCII 查询：删掉非 \w 字符的 translate 表，与 _WORD_RE 在 ASCII 上的结果一致
+_ASCII_NON_WORD = str.maketrans("", "", "".join(c for c in map(chr, range(128)) if not (c.isalnum() or c == "_")))
 
 
 def _tokenize(query: str) -> list[str]:
     q = normalize_text(query)
     # 如果有空格，按空格拆；否则对中文/无空格场景用 2-gram
     if " " in q:
-        parts = [p for p in q.split(" ") if p]
-        return parts
+        return q.split(" ")
 
-    q2 = _NON_WORD.sub("", q)
+    q2 = q.translate(_ASCII_NON_WORD) if q.isascii() else "".join(_WORD_RE.findall(q))
     if len(q2) <= 2:
         return [q2] if q2 else []
 
-    grams = [q2[i : i + 2] for i in range(len(q2) - 1)]
     # 去重但保持顺序
-    seen: set[str] = set()
-    out: list[str] = []
-    for g in grams:
-        if g and g not in seen:
-            out.append(g)
-            seen.add(g)
-    return out
+    return list(dict.fromkeys(q2[i : i + 2] for i in range(len(q2) - 1)))
+
+
+_RAW_STR_FIELDS = ("id", "topic", "summary")
+_RAW_LIST_FIELDS = ("task_tags", "key_path_features", "preference_rules", "exception_handling", "anti_patterns")
 
 
-def _score_record(record: CognitionRecord, *, query: str) -> float:
-    tokens = _tokenize(query)
-    if not tokens:
-        return 0.0
+def _check_raw_row(row: dict) -> str | None:
+    """append_raw_many 的廉价校验：返回问题描述，合法时返回 None。"""
+    for key in _RAW_STR_FIELDS:
+        if not isinstance(row.get(key), str):
+            return f"{key} 缺失或不是字符串"
+    created_at = row.get("created_at")
+    if created_at is not None:
+        if isinstance(created_at, bool) or not isinstance(created_at, (str, int, float)):
+            return "created_at 类型不合法"
+        if isinstance(created_at, str):
+            try:
+                datetime.fromisoformat(created_at)
+            except ValueError:
+                try:
+                    float(created_at)
+                except ValueError:
+                    return f"created_at 无法解析: {created_at!r}"
+    source = row.get("source_recording")
+    if source is not None and not isinstance(source, str):
+        return "source_recording 不是字符串"
+    for key in _RAW_LIST_FIELDS:
+        value = row.get(key, [])
+        if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+            return f"{key} 不是字符串列表"
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _query_tokens(query: str) -> tuple[str, ...]:
+    """查询的小写 token（缓存；返回 tuple 避免共享结果被修改）"""
+    return tuple(tl for tl in (t.lower() for t in _tokenize(query)) if tl)
 
-    blob = "\n".join(
+
+def _record_blob(record: CognitionRecord) -> str:
+    return "\n".join(
         [
             record.topic,
             " ".join(record.task_tags),
@@ -94,20 +326,47 @@ def _score_record(record: CognitionRecord, *, query: str) -> float:
         ]
     ).lower()
 
-    score = 0.0
-    for t in tokens:
-        tl = t.lower()
-        if not tl:
-            continue
-        if tl in blob:
-            score += 1.0
 
-    # 新近性加成（轻微）：越新越高
-    now = datetime.now(timezone.utc)
+# Okapi BM25 参数
+_BM25_K1 = 1.5
+_BM25_B = 0.75
+
+
+def _bm25_idf(n: int, n_docs: int) -> float:
+    """n 为包含该 token 的记录数；+1 保证 IDF 恒为正（token 出现在所有记录中时也不为负）"""
+    return math.log((n_docs - n + 0.5) / (n + 0.5) + 1.0)
+
+
+def _bm25_tf(tf: int, dl: int, avgdl: float) -> float:
+    """词频饱和 + 文档长度归一化（token 以子串出现次数计词频，长度以字符计）"""
+    return tf * (_BM25_K1 + 1.0) / (tf + _BM25_K1 * (1.0 - _BM25_B + _BM25_B * dl / avgdl))
+
+
+def _count_overlapping(text: str, sub: str) -> int:
+    """sub 在 text 中的出现次数（允许重叠，与 gram posting 的计数口径一致）"""
+    n = 0
+    j = text.find(sub)
+    while j != -1:
+        n += 1
+        j = text.find(sub, j + 1)
+    return n
+
+
+def _created_epoch(record: CognitionRecord) -> float:
     created_at = record.created_at
     # 处理 naive datetime（无时区信息）的情况，假设它是 UTC
     if created_at.tzinfo is None:
         created_at = created_at.replace(tzinfo=timezone.utc)
-    age_days = (now - created_at).total_seconds() / 86400.0
+    return created_at.timestamp()
+
+
+def _combine_score(score: float, created_epoch: float, now: float, length_score: float) -> float:
+    """now / created_epoch 均为 epoch 秒：检索时只取一次 time.time()，逐条记录只做浮点运算"""
+    # 新近性加成（轻微）：越新越高
+    age_days = (now - created_epoch) / 86400.0
     recency_boost = 1.0 / (1.0 + max(age_days, 0.0) / 30.0)  # 30 天半衰
-    return score * (0.7 + 0.3 * recency_boost) + 0.01 * math.log(1 + len(blob))
+    return score * (0.7 + 0.3 * recency_boost) + length_score
+
+
+def _length_score(blob: str) -> float:
+    return 0.01 * math.log(1 + len(blob))
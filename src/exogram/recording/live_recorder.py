@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import asyncio
+import importlib
+import inspect
+import os
+import sys
 import time
+from collections import deque
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Callable
+from urllib.parse import urlparse
 
 from exogram.models import RawStep, RawStepsDocument
 from exogram.utils import get_logger, normalize_text, safe_preview_value
@@ -14,7 +22,7 @@ logger = get_logger("exogram")
 DEFAULT_STORAGE_STATE_DIR = Path.home() / ".exogram" / "auth"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class _Event:
     kind: str
     url: str | None
@@ -23,7 +31,7 @@ class _Event:
     target_label: str | None
     value: str | None
     meta: dict[str, Any]
-    ts: float
+    ts: int  # time.monotonic_ns()，输出时再换算成墙钟秒
 
 
 # 可交互元素的 role 和 tag
@@ -46,27 +54,132 @@ _NON_INTERACTIVE_CONTAINERS = frozenset({
 })
 
 
-_INIT_SCRIPT = r"""
+def _strip_js_comments(source: str) -> str:
+    """去掉整行注释、缩进和空行（逐行处理，保留换行以免影响 ASI），缩小每个页面注入的脚本体积。"""
+    lines = (line.strip() for line in source.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+
+_INIT_SCRIPT_SOURCE = r"""
 (() => {
   const EXO_ID = "__exogram_stop_btn__";
   const EXO_BADGE_ID = "__exogram_badge__";
 
+  // 正则统一在此创建一次，点击处理等热路径中只复用
+  const RE_WHITESPACE = /\s+/g;
+  const RE_DYNAMIC_ID = /^(ember|react|vue|ng-|__)/i;
+  const RE_DIGITS = /^\d+$/;
+  const RE_DOUBLE_QUOTE = /"/g;
+  const RE_VOLATILE_CLASS = /^(active|selected|hover|focus|open|show|hide|ng-|ember|react)/i;
+  const RE_CLICKABLE_CLASS = /click|btn|button|link|item|option|select/;
+  const RE_CURSOR_POINTER_CLASS = /(^|\s)cursor-pointer(\s|$)/;
+
+  // 组件库 class 片段 -> 组件类型（按优先级排列，子串匹配）
+  const COMPONENT_PATTERNS = [
+    // Ant Design 组件
+    ["ant-tree", "antd:tree"],
+    ["ant-select", "antd:select"],
+    ["ant-dropdown", "antd:dropdown"],
+    ["ant-modal", "antd:modal"],
+    ["ant-drawer", "antd:drawer"],
+    ["ant-table", "antd:table"],
+    ["ant-tabs", "antd:tabs"],
+    ["ant-menu", "antd:menu"],
+    ["ant-picker", "antd:datepicker"],
+    ["ant-input", "antd:input"],
+    ["ant-btn", "antd:button"],
+    ["ant-checkbox", "antd:checkbox"],
+    ["ant-radio", "antd:radio"],
+    ["ant-switch", "antd:switch"],
+    ["ant-collapse", "antd:collapse"],
+    ["ant-tooltip", "antd:tooltip"],
+    ["ant-popover", "antd:popover"],
+    ["ant-form", "antd:form"],
+    // Element UI / Element Plus 组件
+    ["el-tree", "element:tree"],
+    ["el-select", "element:select"],
+    ["el-dropdown", "element:dropdown"],
+    ["el-dialog", "element:dialog"],
+    ["el-table", "element:table"],
+    ["el-tabs", "element:tabs"],
+    ["el-menu", "element:menu"],
+    ["el-date", "element:datepicker"],
+    ["el-input", "element:input"],
+    ["el-button", "element:button"],
+    // Arco Design 组件
+    ["arco-tree", "arco:tree"],
+    ["arco-select", "arco:select"],
+  ];
+
   function safeText(s) {
-    return (s || "").replace(/\s+/g, " ").trim();
+    return (s || "").replace(RE_WHITESPACE, " ").trim();
   }
 
-  function roleOf(el) {
+  // 按元素缓存纯计算结果：SPA 里常在同一树/菜单节点上连续点击，短时间内直接复用。
+  // WeakMap 随 DOM 节点被路由卸载而自动释放；TTL 兜住 class/属性随交互变化的情况。
+  const ELEMENT_CACHE_TTL_MS = 1000;
+  const attrsCache = new WeakMap();
+  const testIdCache = new WeakMap();
+  const dataAttrsCache = new WeakMap();
+  const selectorCache = new WeakMap();
+  const componentCache = new WeakMap();
+  const cursorCache = new WeakMap();
+  const parentContextCache = new WeakMap();
+
+  function cachedFor(cache, el, compute) {
+    const now = performance.now();
+    const hit = cache.get(el);
+    if (hit && now - hit.t < ELEMENT_CACHE_TTL_MS) return hit.v;
+    const v = compute(el);
+    cache.set(el, { t: now, v });
+    return v;
+  }
+
+  // 一次遍历 el.attributes 得到 {name: value}（忽略空值），各 helper 共用，避免逐个 getAttribute
+  function scanAttrs(el) {
+    const a = Object.create(null);
     try {
-      const r = el.getAttribute && el.getAttribute("role");
-      if (r) return safeText(r);
+      const attrs = el.attributes;
+      if (!attrs) return a;
+      for (let i = 0; i < attrs.length; i++) {
+        const attr = attrs[i];
+        if (attr.value) a[attr.name] = attr.value;
+      }
     } catch (_) {}
+    return a;
+  }
+
+  function attrsOf(el) {
+    return cachedFor(attrsCache, el, scanAttrs);
+  }
+
+  // 元素的 class 文本直接取自属性扫描结果：各模式都是不含空白的子串匹配，与 classList.join(" ") 等价，
+  // 且每个元素只分词一次（getParentContext 沿祖先链调用 detectComponentType 时父子可共用）
+  function classTextOf(el) {
+    return attrsOf(el)["class"] || "";
+  }
+
+  // 事件入口处重新扫描一次，保证本次事件读到的是最新属性
+  function rescanAttrs(el) {
+    const a = scanAttrs(el);
+    attrsCache.set(el, { t: performance.now(), v: a });
+    return a;
+  }
+
+  // input type -> 隐式 role
+  const INPUT_BUTTON_TYPES = new Set(["submit", "button", "reset", "image"]);
+  const INPUT_TOGGLE_TYPES = new Set(["checkbox", "radio"]);
+
+  function roleOf(el) {
+    const A = attrsOf(el);
+    if (A.role) return safeText(A.role);
     const tag = (el.tagName || "").toLowerCase();
     if (tag === "a") return "link";
     if (tag === "button") return "button";
     if (tag === "input") {
-      const t = ((el.getAttribute && el.getAttribute("type")) || "text").toLowerCase();
-      if (["submit", "button", "reset", "image"].includes(t)) return "button";
-      if (["checkbox", "radio"].includes(t)) return t;
+      const t = (A.type || "text").toLowerCase();
+      if (INPUT_BUTTON_TYPES.has(t)) return "button";
+      if (INPUT_TOGGLE_TYPES.has(t)) return t;
       return "input";
     }
     if (tag === "select") return "select";
@@ -83,18 +196,10 @@ _INIT_SCRIPT = r"""
       }
     } catch (_) {}
 
-    try {
-      const aria = el.getAttribute && el.getAttribute("aria-label");
-      if (aria) return safeText(aria);
-    } catch (_) {}
-    try {
-      const ph = el.getAttribute && el.getAttribute("placeholder");
-      if (ph) return safeText(ph);
-    } catch (_) {}
-    try {
-      const nm = el.getAttribute && el.getAttribute("name");
-      if (nm) return safeText(nm);
-    } catch (_) {}
+    const A = attrsOf(el);
+    if (A["aria-label"]) return safeText(A["aria-label"]);
+    if (A.placeholder) return safeText(A.placeholder);
+    if (A.name) return safeText(A.name);
     return null;
   }
 
@@ -104,16 +209,9 @@ _INIT_SCRIPT = r"""
       t = safeText(el.innerText);
     } catch (_) {}
     if (!t) {
-      try {
-        const aria = el.getAttribute && el.getAttribute("aria-label");
-        if (aria) t = safeText(aria);
-      } catch (_) {}
-    }
-    if (!t) {
-      try {
-        const title = el.getAttribute && el.getAttribute("title");
-        if (title) t = safeText(title);
-      } catch (_) {}
+      const A = attrsOf(el);
+      if (A["aria-label"]) t = safeText(A["aria-label"]);
+      if (!t && A.title) t = safeText(A.title);
     }
     return t || null;
   }
@@ -122,36 +220,48 @@ _INIT_SCRIPT = r"""
 
   // 获取 data-testid 或常见测试属性
   function getTestId(el) {
-    const attrs = ["data-testid", "data-test-id", "data-cy", "data-test", "data-qa"];
-    for (const attr of attrs) {
-      try {
-        const v = el.getAttribute && el.getAttribute(attr);
-        if (v) return { attr, value: safeText(v) };
-      } catch (_) {}
+    return cachedFor(testIdCache, el, computeTestId);
+  }
+
+  const TEST_ID_ATTRS = ["data-testid", "data-test-id", "data-cy", "data-test", "data-qa"];
+
+  function computeTestId(el) {
+    const A = attrsOf(el);
+    for (const attr of TEST_ID_ATTRS) {
+      const v = A[attr];
+      if (v) return { attr, value: safeText(v) };
     }
     return null;
   }
 
   // 获取所有 data-* 属性（用于调试和增强定位）
   function getDataAttrs(el) {
-    const result = {};
-    try {
-      if (!el.attributes) return result;
-      for (const attr of el.attributes) {
-        if (attr.name.startsWith("data-") && attr.value) {
-          // 过滤掉过长或无意义的值
-          const v = safeText(attr.value);
-          if (v && v.length < 100) {
-            result[attr.name] = v;
-          }
+    return cachedFor(dataAttrsCache, el, computeDataAttrs);
+  }
+
+  // 没有可用的 data-* 属性时返回 null（只在命中时才分配结果对象）
+  function computeDataAttrs(el) {
+    let result = null;
+    const A = attrsOf(el);
+    for (const name in A) {
+      if (name.startsWith("data-")) {
+        // 过滤掉过长或无意义的值
+        const v = safeText(A[name]);
+        if (v && v.length < 100) {
+          if (result === null) result = {};
+          result[name] = v;
         }
       }
-    } catch (_) {}
+    }
     return result;
   }
 
   // 生成稳定的 CSS selector（优先使用唯一标识）
   function buildSelector(el) {
+    return cachedFor(selectorCache, el, computeSelector);
+  }
+
+  function computeSelector(el) {
     try {
       // 1. 优先 data-testid
       const testId = getTestId(el);
@@ -161,19 +271,20 @@ _INIT_SCRIPT = r"""
 
       // 2. 有意义的 id（排除动态生成的 id）
       const id = el.id;
-      if (id && !/^(ember|react|vue|ng-|__)/i.test(id) && !/^\d+$/.test(id) && id.length < 50) {
+      if (id && !RE_DYNAMIC_ID.test(id) && !RE_DIGITS.test(id) && id.length < 50) {
         return `#${CSS.escape(id)}`;
       }
 
       // 3. 有 name 属性的表单元素
-      const name = el.getAttribute && el.getAttribute("name");
+      const A = attrsOf(el);
+      const name = A.name;
       if (name) {
         const tag = (el.tagName || "").toLowerCase();
         return `${tag}[name="${CSS.escape(name)}"]`;
       }
 
       // 4. 有 aria-label 的元素
-      const ariaLabel = el.getAttribute && el.getAttribute("aria-label");
+      const ariaLabel = A["aria-label"];
       if (ariaLabel && ariaLabel.length < 50) {
         const tag = (el.tagName || "").toLowerCase();
         return `${tag}[aria-label="${CSS.escape(ariaLabel)}"]`;
@@ -181,10 +292,10 @@ _INIT_SCRIPT = r"""
 
       // 5. 按钮/链接用文本定位
       const tag = (el.tagName || "").toLowerCase();
-      if (["button", "a"].includes(tag)) {
+      if (tag === "button" || tag === "a") {
         const txt = safeText(el.innerText);
         if (txt && txt.length < 30) {
-          return `${tag}:has-text("${txt.replace(/"/g, '\\"')}")`;
+          return `${tag}:has-text("${txt.replace(RE_DOUBLE_QUOTE, '\\"')}")`;
         }
       }
 
@@ -207,13 +318,16 @@ _INIT_SCRIPT = r"""
 
       let part = tag;
 
-      // 添加有意义的 class（过滤动态 class）
-      const classes = Array.from(current.classList || [])
-        .filter(c => c && !/^(active|selected|hover|focus|open|show|hide|ng-|ember|react)/i.test(c))
-        .filter(c => c.length < 30)
-        .slice(0, 2);
-      if (classes.length > 0) {
-        part += "." + classes.map(c => CSS.escape(c)).join(".");
+      // 添加有意义的 class（过滤动态 class），单次遍历，取满 2 个即停
+      const cl = current.classList;
+      if (cl) {
+        let picked = 0;
+        for (let i = 0; i < cl.length && picked < 2; i++) {
+          const c = cl[i];
+          if (!c || c.length >= 30 || RE_VOLATILE_CLASS.test(c)) continue;
+          part += "." + CSS.escape(c);
+          picked++;
+        }
       }
 
       parts.unshift(part);
@@ -228,46 +342,16 @@ _INIT_SCRIPT = r"""
   
   // 识别 Ant Design / Element UI / Arco 等组件
   function detectComponentType(el) {
+    return cachedFor(componentCache, el, computeComponentType);
+  }
+
+  function computeComponentType(el) {
     try {
-      const classList = Array.from(el.classList || []).join(" ");
-      const parentClasses = el.parentElement ? Array.from(el.parentElement.classList || []).join(" ") : "";
-      const allClasses = classList + " " + parentClasses;
-
-      // Ant Design 组件
-      if (/ant-tree/.test(allClasses)) return "antd:tree";
-      if (/ant-select/.test(allClasses)) return "antd:select";
-      if (/ant-dropdown/.test(allClasses)) return "antd:dropdown";
-      if (/ant-modal/.test(allClasses)) return "antd:modal";
-      if (/ant-drawer/.test(allClasses)) return "antd:drawer";
-      if (/ant-table/.test(allClasses)) return "antd:table";
-      if (/ant-tabs/.test(allClasses)) return "antd:tabs";
-      if (/ant-menu/.test(allClasses)) return "antd:menu";
-      if (/ant-picker/.test(allClasses)) return "antd:datepicker";
-      if (/ant-input/.test(allClasses)) return "antd:input";
-      if (/ant-btn/.test(allClasses)) return "antd:button";
-      if (/ant-checkbox/.test(allClasses)) return "antd:checkbox";
-      if (/ant-radio/.test(allClasses)) return "antd:radio";
-      if (/ant-switch/.test(allClasses)) return "antd:switch";
-      if (/ant-collapse/.test(allClasses)) return "antd:collapse";
-      if (/ant-tooltip/.test(allClasses)) return "antd:tooltip";
-      if (/ant-popover/.test(allClasses)) return "antd:popover";
-      if (/ant-form/.test(allClasses)) return "antd:form";
-
-      // Element UI / Element Plus 组件
-      if (/el-tree/.test(allClasses)) return "element:tree";
-      if (/el-select/.test(allClasses)) return "element:select";
-      if (/el-dropdown/.test(allClasses)) return "element:dropdown";
-      if (/el-dialog/.test(allClasses)) return "element:dialog";
-      if (/el-table/.test(allClasses)) return "element:table";
-      if (/el-tabs/.test(allClasses)) return "element:tabs";
-      if (/el-menu/.test(allClasses)) return "element:menu";
-      if (/el-date/.test(allClasses)) return "element:datepicker";
-      if (/el-input/.test(allClasses)) return "element:input";
-      if (/el-button/.test(allClasses)) return "element:button";
-
-      // Arco Design 组件
-      if (/arco-tree/.test(allClasses)) return "arco:tree";
-      if (/arco-select/.test(allClasses)) return "arco:select";
+      const allClasses = classTextOf(el) + " " + (el.parentElement ? classTextOf(el.parentElement) : "");
+
+      for (const [needle, type] of COMPONENT_PATTERNS) {
+        if (allClasses.includes(needle)) return type;
+      }
 
       return null;
     } catch (_) {
@@ -326,6 +410,11 @@ _INIT_SCRIPT = r"""
     }
   }
 
+  function indexInParent(el) {
+    const siblings = el.parentElement ? el.parentElement.children : null;
+    return siblings ? Array.prototype.indexOf.call(siblings, el) : -1;
+  }
+
   // 获取表格单元格信息
   function getTableCellInfo(el) {
     try {
@@ -333,8 +422,9 @@ _INIT_SCRIPT = r"""
       if (!cell) return null;
 
       const row = cell.closest("tr, .ant-table-row, .el-table__row");
-      const rowIndex = row ? Array.from(row.parentElement?.children || []).indexOf(row) : -1;
-      const cellIndex = Array.from(cell.parentElement?.children || []).indexOf(cell);
+      // 直接在 HTMLCollection 上 indexOf，不把整张表的行复制成数组
+      const rowIndex = row ? indexInParent(row) : -1;
+      const cellIndex = indexInParent(cell);
 
       // 尝试获取列标题
       const table = cell.closest("table, .ant-table, .el-table");
@@ -353,7 +443,12 @@ _INIT_SCRIPT = r"""
   }
 
   // 获取父级组件上下文
-  function getParentContext(el, maxLevels = 3) {
+  // 结果按元素缓存：祖先的 innerText 可能很大（整张表格），同一节点的连续点击/输入只计算一次
+  function getParentContext(el) {
+    return cachedFor(parentContextCache, el, computeParentContext);
+  }
+
+  function computeParentContext(el, maxLevels = 3) {
     const context = [];
     let current = el.parentElement;
     let level = 0;
@@ -495,43 +590,46 @@ _INIT_SCRIPT = r"""
     "form", "article", "section", "presentation", "none"
   ]);
 
-  // 判断元素是否是可交互的
-  function isInteractiveElement(el) {
+  // UI 组件中可交互部分的并集选择器（Tree 展开图标/标题、表格展开按钮、Tab、菜单项、Select 选项），一次 closest 完成匹配
+  const INTERACTIVE_COMPONENT_SELECTOR = [
+    ".ant-tree-switcher", ".el-tree-node__expand-icon",
+    ".ant-tree-title", ".el-tree-node__label",
+    ".ant-table-row-expand-icon-cell",
+    ".ant-tabs-tab", ".el-tabs__item",
+    ".ant-menu-item", ".ant-dropdown-menu-item", ".el-menu-item",
+    ".ant-select-item", ".el-select-dropdown__item",
+  ].join(",");
+
+  // 容器类 tag - 这些 tag 的点击通常无意义
+  const CONTAINER_TAGS = new Set([
+    "div", "span", "section", "article", "main", "aside", "nav", "header", "footer"
+  ]);
+
+  // 判断元素是否是可交互的（tag / role 由调用方预先算好时直接传入）
+  function isInteractiveElement(el, tag, role) {
     try {
-      const tag = (el.tagName || "").toLowerCase();
-      
+      if (tag === undefined) tag = (el.tagName || "").toLowerCase();
+      const A = attrsOf(el);
+      if (role === undefined) role = (A.role || "").toLowerCase();
+
       // 1. 检查 tag
       if (INTERACTIVE_TAGS.has(tag)) return true;
       
       // 2. 检查 role
-      const role = el.getAttribute && el.getAttribute("role");
-      if (role && INTERACTIVE_ROLES.has(role.toLowerCase())) return true;
+      if (role && INTERACTIVE_ROLES.has(role)) return true;
       
       // 3. 检查 tabindex
-      const tabindex = el.getAttribute && el.getAttribute("tabindex");
+      const tabindex = A.tabindex;
       if (tabindex && parseInt(tabindex, 10) >= 0) return true;
       
       // 4. 检查 onclick 等事件属性
-      if (el.onclick || el.getAttribute && el.getAttribute("onclick")) return true;
+      if (el.onclick || A.onclick) return true;
       
       // 5. 检查是否是 UI 组件的可交互部分
-      // Tree 节点的展开/收起图标
-      if (el.closest(".ant-tree-switcher, .el-tree-node__expand-icon")) return true;
-      // 树节点标题
-      if (el.closest(".ant-tree-title, .el-tree-node__label")) return true;
-      // 表格行的展开按钮
-      if (el.closest(".ant-table-row-expand-icon-cell")) return true;
-      // Tab 标签
-      if (el.closest(".ant-tabs-tab, .el-tabs__item")) return true;
-      // 菜单项
-      if (el.closest(".ant-menu-item, .ant-dropdown-menu-item, .el-menu-item")) return true;
-      // Select 选项
-      if (el.closest(".ant-select-item, .el-select-dropdown__item")) return true;
-      // 有 cursor: pointer 样式的元素
-      try {
-        const cursor = getComputedStyle(el).cursor;
-        if (cursor === "pointer") return true;
-      } catch (_) {}
+      if (el.closest(INTERACTIVE_COMPONENT_SELECTOR)) return true;
+
+      // 有 cursor: pointer 样式的元素（会触发样式计算，放在最后）
+      if (hasPointerCursor(el)) return true;
       
       return false;
     } catch (_) {
@@ -539,52 +637,58 @@ _INIT_SCRIPT = r"""
     }
   }
 
+  // Tailwind 等工具类直接声明了 cursor: pointer，命中时无需样式计算；否则读 computed style 并按元素缓存
+  function hasPointerCursor(el) {
+    if (RE_CURSOR_POINTER_CLASS.test(classTextOf(el))) return true;
+    return cachedFor(cursorCache, el, computeCursor) === "pointer";
+  }
+
+  function computeCursor(el) {
+    try {
+      return getComputedStyle(el).cursor;
+    } catch (_) {
+      return null;
+    }
+  }
+
   // 判断点击是否应该被过滤（无意义点击）
-  function shouldFilterClick(el) {
+  // tag / isInteractive 由点击监听器预先算好传入，避免重复的属性读取与样式计算
+  function shouldFilterClick(el, tag, isInteractive) {
     try {
-      // 检查 role - 容器类 role 的点击通常无意义
-      const role = el.getAttribute && el.getAttribute("role");
-      if (role && CONTAINER_ROLES.has(role.toLowerCase())) {
-        // 容器 role 的点击应该被过滤，用户应该点击具体的子元素
-        return true;
-      }
-      
       // 如果元素本身或其近似祖先是可交互的，不过滤
-      if (isInteractiveElement(el)) return false;
-      
-      // 检查点击的文本长度 - 如果太长可能是点击了整个容器
-      const text = safeText(el.innerText || "");
-      if (text.length > 200) {
-        // 但如果是在特定组件内，可能是有效点击
-        const compType = detectComponentType(el);
-        if (!compType) return true;  // 不在已知组件内的长文本点击，过滤
-      }
-      
-      // 检查 tag - 某些容器 tag 的点击通常无意义
-      const tag = (el.tagName || "").toLowerCase();
-      if (["div", "span", "section", "article", "main", "aside", "nav", "header", "footer"].includes(tag)) {
-        // 但如果有特定的 class 或 role，可能是有效点击
-        if (role && INTERACTIVE_ROLES.has(role.toLowerCase())) return false;
-        
-        // 检查是否在已识别的 UI 组件内
-        const compType = detectComponentType(el);
-        if (compType) return false;
-        
-        // 检查是否有点击相关的 class
-        const classList = Array.from(el.classList || []).join(" ").toLowerCase();
-        if (/click|btn|button|link|item|option|select/.test(classList)) return false;
-        
-        return true;  // 普通容器 div/span 点击，过滤
-      }
-      
-      return false;
+      if (isInteractive) return false;
+
+      // 在已识别的 UI 组件内的点击，不论 tag / 文本长短都视为有效
+      if (detectComponentType(el)) return false;
+
+      // 检查 tag - 普通容器 div/span 点击，除非带点击相关的 class，否则过滤
+      if (CONTAINER_TAGS.has(tag) && !RE_CLICKABLE_CLASS.test(classTextOf(el).toLowerCase())) return true;
+
+      // 检查点击的文本长度 - 太长可能是点击了整个容器
+      // innerText 需要布局并序列化整棵子树，代价最高，只在前面的判断都无法下结论时读取
+      return safeText(el.innerText || "").length > 200;
     } catch (_) {
       return false;
     }
   }
 
   // ========== 增强：获取页面可交互元素快照 ==========
-  
+
+  // 快照签名：URL + 标题 + 几类可交互标签的数量。不观察 DOM；
+  // getElementsByTagName 返回的是浏览器维护的 live collection，读 length 不需要在 JS 里遍历节点
+  const SIG_TAGS = ["a", "button", "input", "select", "textarea"];
+  let sigCollections = null;
+
+  function domSignature() {
+    try {
+      if (!sigCollections) sigCollections = SIG_TAGS.map((t) => document.getElementsByTagName(t));
+      const counts = sigCollections.map((c) => Math.min(c.length, 10000));
+      return location.href + "|" + (document.title || "") + "|" + counts.join(",");
+    } catch (_) {
+      return null;
+    }
+  }
+
   function getPageSnapshot() {
     try {
       const elements = [];
@@ -642,13 +746,64 @@ _INIT_SCRIPT = r"""
 
   // 暴露给 Python 侧调用
   window.__exogram_get_page_snapshot__ = getPageSnapshot;
+  // 带签名的版本：签名与 Python 侧上次记录的一致时不再生成/回传快照
+  window.__exogram_snapshot_if_changed__ = (lastSig) => {
+    const sig = domSignature();
+    if (lastSig && sig === lastSig) return { sig, snapshot: null };
+    return { sig, snapshot: getPageSnapshot() };
+  };
+
+  // 事件批量上报：每次 binding 调用都是一次 CDP 往返，短时间内的事件合并成一次调用。
+  // click 可能立即触发跳转，连同之前缓冲的事件一起立即上报，保证与 Python 侧 navigate 事件的先后顺序。
+  const SEND_BATCH_MAX = 32;
+  const SEND_FLUSH_MS = 50;
+  const sendBuffer = [];
+  let sendTimer = null;
+
+  // 事件发生时刻（epoch 毫秒，高精度且同一文档内单调）：随事件上报，批量发送不丢失批内先后与间隔
+  function eventTime() {
+    return performance.timeOrigin + performance.now();
+  }
 
   function send(ev) {
+    if (ev.t === undefined) ev.t = eventTime();
+    sendBuffer.push(ev);
+    if (ev.kind === "click" || sendBuffer.length >= SEND_BATCH_MAX) {
+      flushSend();
+    } else if (sendTimer === null) {
+      sendTimer = setTimeout(flushSend, SEND_FLUSH_MS);
+    }
+  }
+
+  function flushSend() {
+    if (sendTimer !== null) {
+      clearTimeout(sendTimer);
+      sendTimer = null;
+    }
+    if (!sendBuffer.length) return;
+    const batch = sendBuffer.splice(0);
     try {
-      if (window.exogram_record_event) window.exogram_record_event(ev);
+      if (window.exogram_record_events) window.exogram_record_events(batch);
     } catch (_) {}
   }
 
+  // 录制按钮样式：每个元素一次 cssText 赋值（不注入 <style>，避免受页面 CSP 的 style-src 限制）
+  const EXO_BADGE_CSS = [
+    "position:fixed", "top:12px", "right:12px", "z-index:2147483647",
+    "display:flex", "gap:8px", "align-items:center",
+    "font-family:system-ui, -apple-system, Segoe UI, Roboto, sans-serif",
+    "pointer-events:auto",
+  ].join(";");
+  const EXO_DOT_CSS = [
+    "width:10px", "height:10px", "border-radius:999px", "background:#ef4444",
+    "box-shadow:0 0 0 4px rgba(239, 68, 68, 0.18)",
+  ].join(";");
+  const EXO_BTN_CSS = [
+    "padding:10px 14px", "background:#ef4444", "color:#fff", "border:none",
+    "border-radius:999px", "font-size:14px", "font-weight:600",
+    "box-shadow:0 10px 24px rgba(0,0,0,.25)", "cursor:pointer",
+  ].join(";");
+
   function ensureStopUI() {
     if (document.getElementById(EXO_ID)) return true;
     const root = document.body || document.documentElement;
@@ -656,42 +811,16 @@ _INIT_SCRIPT = r"""
 
     const wrap = document.createElement("div");
     wrap.id = EXO_BADGE_ID;
-    Object.assign(wrap.style, {
-      position: "fixed",
-      top: "12px",
-      right: "12px",
-      zIndex: "2147483647",
-      display: "flex",
-      gap: "8px",
-      alignItems: "center",
-      fontFamily: "system-ui, -apple-system, Segoe UI, Roboto, sans-serif",
-      pointerEvents: "auto",
-    });
+    wrap.style.cssText = EXO_BADGE_CSS;
 
     const dot = document.createElement("div");
-    Object.assign(dot.style, {
-      width: "10px",
-      height: "10px",
-      borderRadius: "999px",
-      background: "#ef4444",
-      boxShadow: "0 0 0 4px rgba(239, 68, 68, 0.18)",
-    });
+    dot.style.cssText = EXO_DOT_CSS;
 
     const btn = document.createElement("button");
     btn.id = EXO_ID;
     btn.type = "button";
     btn.textContent = "结束录制";
-    Object.assign(btn.style, {
-      padding: "10px 14px",
-      background: "#ef4444",
-      color: "#fff",
-      border: "none",
-      borderRadius: "999px",
-      fontSize: "14px",
-      fontWeight: "600",
-      boxShadow: "0 10px 24px rgba(0,0,0,.25)",
-      cursor: "pointer",
-    });
+    btn.style.cssText = EXO_BTN_CSS;
 
     btn.addEventListener(
       "click",
@@ -701,6 +830,7 @@ _INIT_SCRIPT = r"""
           e.stopPropagation();
           e.stopImmediatePropagation();
         } catch (_) {}
+        flushPending();
         try {
           if (window.exogram_stop_recording) window.exogram_stop_recording();
         } catch (_) {}
@@ -723,20 +853,21 @@ _INIT_SCRIPT = r"""
   }
   mountLoop(0);
 
-  // 页面 SPA 更新/替换时，尽量保持按钮存在
-  const obs = new MutationObserver(() => ensureStopUI());
-  function observeLoop(attempt) {
-    const root = document.documentElement || document.body;
-    if (!root) {
-      if ((attempt || 0) > 120) return;
-      setTimeout(() => observeLoop((attempt || 0) + 1), 50);
-      return;
-    }
+  // 页面 SPA 更新/替换时，尽量保持按钮存在。
+  // 按钮挂在 body（或 documentElement）下，只有 document / documentElement / body 的直接子节点变化才可能移除它，
+  // 因此只观察这三层的 childList，不订阅整棵子树；body 被替换后在回调里重新绑定到新 body。
+  const obs = new MutationObserver(() => {
+    ensureStopUI();
+    watchMountRoots();
+  });
+  function watchMountRoots() {
     try {
-      obs.observe(root, { childList: true, subtree: true });
+      obs.observe(document, { childList: true });
+      if (document.documentElement) obs.observe(document.documentElement, { childList: true });
+      if (document.body) obs.observe(document.body, { childList: true });
     } catch (_) {}
   }
-  observeLoop(0);
+  watchMountRoots();
 
   // 给 Python 侧一个可调用的兜底挂载入口（页面加载后可再次执行）
   try {
@@ -745,17 +876,49 @@ _INIT_SCRIPT = r"""
     };
   } catch (_) {}
 
+  // 输入防抖：连续按键只在停顿后上报一次最终值（Python 侧本来也只保留最终值）
+  const INPUT_DEBOUNCE_MS = 150;
+  let pendingInput = null;
+  let pendingInputT = 0;  // 最后一次按键的时刻，作为该输入事件的时间
+  let inputTimer = null;
+
+  // 立即上报挂起的输入；点击 / 跳转前调用，保证事件顺序不乱
+  function flushInput() {
+    if (inputTimer !== null) {
+      clearTimeout(inputTimer);
+      inputTimer = null;
+    }
+    const target = pendingInput;
+    pendingInput = null;
+    if (target) sendInput(target, pendingInputT);
+  }
+
+  // 上报所有挂起的输入与缓冲事件（回车、提交、结束录制、页面跳转/卸载前）
+  function flushPending() {
+    flushInput();
+    flushSend();
+  }
+
   document.addEventListener(
     "click",
     (e) => {
+      flushInput();
       const target = e.target;
       if (!(target instanceof Element)) return;
       if (target.closest && (target.closest("#" + EXO_ID) || target.closest("#" + EXO_BADGE_ID))) return;
 
       const el = target.closest("a,button,input,textarea,select,[role]") || target;
-      
+      const tag = (el.tagName || "").toLowerCase();
+      const role = (rescanAttrs(el).role || "").toLowerCase();
+
+      // 容器类 role 的点击通常无意义，用户应该点击具体的子元素；只看属性，先于任何 DOM 计算
+      if (role && CONTAINER_ROLES.has(role)) return;
+
+      // 标记是否是可交互元素（只计算一次，过滤与上报共用）
+      const isInteractive = isInteractiveElement(el, tag, role);
+
       // 增强：过滤无意义点击
-      if (shouldFilterClick(el)) {
+      if (shouldFilterClick(el, tag, isInteractive)) {
         return;  // 跳过无意义的点击
       }
       
@@ -782,22 +945,19 @@ _INIT_SCRIPT = r"""
       // 识别 Popover/Select/Dropdown 中的选中项
       selectedOption = detectSelectedOption(el);
       
-      // 标记是否是可交互元素
-      const isInteractive = isInteractiveElement(el);
-
       send({
         kind: "click",
         url: location.href,
         targetText: textOf(el),
         targetRole: roleOf(el),
         targetLabel: labelOf(el),
-        tagName: (el.tagName || "").toLowerCase(),
+        tagName: tag,
         isInteractive: isInteractive,
         // 增强字段
         selector: selector,
         testId: testId,
         componentType: componentType,
-        dataAttrs: Object.keys(dataAttrs).length > 0 ? dataAttrs : null,
+        dataAttrs: dataAttrs,
         parentContext: parentContext,
         directText: directText,
         treeNode: treeNode,
@@ -813,6 +973,25 @@ _INIT_SCRIPT = r"""
     if (!(target instanceof HTMLInputElement || target instanceof HTMLTextAreaElement || target instanceof HTMLSelectElement)) return;
     if (target.closest && (target.closest("#" + EXO_ID) || target.closest("#" + EXO_BADGE_ID))) return;
 
+    // 切换到另一个输入框时先上报上一个
+    if (pendingInput && pendingInput !== target) flushInput();
+    pendingInputT = eventTime();
+
+    // change（失焦、下拉选择、勾选）语义上是一次完整提交，立即上报
+    if (e.type === "change" || target instanceof HTMLSelectElement) {
+      pendingInput = target;
+      flushInput();
+      return;
+    }
+
+    pendingInput = target;
+    if (inputTimer !== null) clearTimeout(inputTimer);
+    inputTimer = setTimeout(flushInput, INPUT_DEBOUNCE_MS);
+  }
+
+  function sendInput(target, t) {
+    rescanAttrs(target);
+
     let val = null;
     let inputType = null;
     if (target instanceof HTMLSelectElement) {
@@ -834,6 +1013,7 @@ _INIT_SCRIPT = r"""
 
     send({
       kind: "input",
+      t: t,
       url: location.href,
       targetText: null,
       targetRole: roleOf(target),
@@ -845,19 +1025,38 @@ _INIT_SCRIPT = r"""
       selector: selector,
       testId: testId,
       componentType: componentType,
-      dataAttrs: Object.keys(dataAttrs).length > 0 ? dataAttrs : null,
+      dataAttrs: dataAttrs,
       parentContext: parentContext,
     });
   }
 
   document.addEventListener("input", onInputLike, true);
   document.addEventListener("change", onInputLike, true);
+  window.addEventListener("pagehide", flushPending, true);
+  // pagehide 时页面已在卸载，binding 调用可能丢失：在跳转真正发生前就同步上报
+  window.addEventListener("beforeunload", flushPending, true);
+  document.addEventListener("submit", flushPending, true);
+  window.addEventListener("popstate", flushPending, true);
+  window.addEventListener("hashchange", flushPending, true);
+  // SPA 路由（pushState/replaceState）不触发卸载事件，包装一层在改 URL 前上报
+  for (const name of ["pushState", "replaceState"]) {
+    try {
+      const orig = history[name];
+      if (typeof orig !== "function") continue;
+      history[name] = function (...args) {
+        flushPending();
+        return orig.apply(this, args);
+      };
+    } catch (_) {}
+  }
 
   // 兜底：Cmd/Ctrl + Esc 结束录制
   document.addEventListener(
     "keydown",
     (e) => {
+      if (e.key === "Enter") flushPending();
       if (e.key === "Escape" && (e.metaKey || e.ctrlKey)) {
+        flushPending();
         try {
           if (window.exogram_stop_recording) window.exogram_stop_recording();
         } catch (_) {}
@@ -868,14 +1067,91 @@ _INIT_SCRIPT = r"""
 })();
 """
 
-_FORCE_MOUNT_UI = r"""
-(() => {
-  try {
-    if (window.__exogram_mount_stop_ui__) return window.__exogram_mount_stop_ui__();
-  } catch (_) {}
-  return false;
-})()
-"""
+# 注入页面的版本：导入时压缩一次
+_INIT_SCRIPT = _strip_js_comments(_INIT_SCRIPT_SOURCE)
+
+# 兜底挂载：只调用 init script 注册的入口（周期性调用，保持表达式尽量短；入口内部已自行吞掉异常）
+_FORCE_MOUNT_UI = "window.__exogram_mount_stop_ui__ ? window.__exogram_mount_stop_ui__() : false"
+
+
+# Playwright 每次 API 调用都会 inspect.stack() 记录调用点（只用于报错/trace 信息），录制时的高频 evaluate 中开销明显。
+# 默认关闭；需要 Playwright 报错中的调用栈时设 EXOGRAM_DISABLE_PW_STACK=0
+_DISABLE_PW_STACK = os.getenv("EXOGRAM_DISABLE_PW_STACK", "1") == "1"
+_PW_STACK_MODULES = ("playwright._impl._connection", "playwright._impl._sync_base")
+
+
+class _NoStackInspect:
+    """inspect 模块代理：stack() 返回空列表，其余属性透传（只替换 Playwright 模块内的引用，不改全局 inspect）。"""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(inspect, name)
+
+    @staticmethod
+    def stack(*args: Any, **kwargs: Any) -> list:
+        return []
+
+
+@lru_cache(maxsize=1)
+def _patch_playwright_stack() -> None:
+    if not _DISABLE_PW_STACK:
+        return
+    for name in _PW_STACK_MODULES:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            continue
+        if getattr(module, "inspect", None) is inspect:
+            module.inspect = _NoStackInspect()
+
+
+# 原样透传到 meta 的增强字段（稳定定位信息）
+_META_PASSTHROUGH_KEYS = (
+    "selector", "testId", "componentType", "dataAttrs", "parentContext",
+    "directText", "treeNode", "tableCell", "selectedOption",
+)
+
+
+def _clean_text(v: Any) -> str | None:
+    return (normalize_text(v) or None) if isinstance(v, str) else None
+
+
+def _event_from_js(obj: Any, ts: int) -> _Event | None:
+    """把 JS 侧上报的原始事件规整为 _Event（非 dict 返回 None）。"""
+    if not isinstance(obj, dict):
+        return None
+    get = obj.get
+    value = get("value")
+
+    meta: dict[str, Any] = {}
+    # 基础字段
+    for k in ("tagName", "inputType"):
+        v = _clean_text(get(k))
+        if v:
+            meta[k] = v
+    # 增强字段：稳定定位信息
+    for k in _META_PASSTHROUGH_KEYS:
+        v = get(k)
+        if v is not None:
+            meta[k] = v
+
+    return _Event(
+        # 入队时即小写并驻留，_build_steps 中的比较走身份比较快路径
+        kind=sys.intern(str(get("kind") or "").strip().lower()),
+        url=_clean_text(get("url")),
+        target_text=_clean_text(get("targetText")),
+        target_role=_clean_text(get("targetRole")),
+        target_label=_clean_text(get("targetLabel")),
+        value=str(value) if isinstance(value, (str, int, float)) else None,
+        meta=meta,
+        ts=ts,
+    )
+
+
+# 连续 input 合并为一次 type 的时间窗口（单调时钟纳秒，5 秒）
+_TYPE_MERGE_WINDOW_NS = 5_000_000_000
+
+# 需要脱敏的 input type
+_SENSITIVE_INPUT_TYPES = frozenset({"password"})
 
 
 def _mask_value(value: str | None, *, input_type: str | None) -> str | None:
@@ -883,11 +1159,22 @@ def _mask_value(value: str | None, *, input_type: str | None) -> str | None:
         return None
     if value == "__PASSWORD__":
         return "***"
-    if input_type and input_type.lower() in {"password"}:
+    if input_type and input_type.lower() in _SENSITIVE_INPUT_TYPES:
         return "***"
     return value
 
 
+def _write_bytes(path: Path, payload: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(payload)
+
+
+def _input_preview(ev: _Event) -> str | None:
+    """input 事件的值：脱敏后截断，作为 type 步骤的 value。"""
+    input_type = str(ev.meta.get("inputType") or "") or None
+    return safe_preview_value(_mask_value(ev.value, input_type=input_type), limit=80)
+
+
 class LiveRecorder:
     """
     交互式录制（Playwright）：
@@ -902,12 +1189,16 @@ class LiveRecorder:
         self._events: list[_Event] = []
         self._last_nav_url: str | None = None
         self._page_snapshots: dict[str, dict] = {}  # url -> snapshot
+        self._snapshot_sigs: dict[str, str] = {}  # url -> 捕获快照时的页面签名
         self._pending_snapshot_url: str | None = None  # 待捕获快照的 URL
+        # 墙钟/单调时钟基准：事件只记单调时钟，输出时换算回墙钟秒
+        self._wall_base = time.time()
+        self._mono_base = time.monotonic_ns()
 
     @staticmethod
+    @lru_cache(maxsize=64)
     def _extract_domain(url: str) -> str:
         """从 URL 提取域名（用于命名 storage state 文件）"""
-        from urllib.parse import urlparse
         try:
             parsed = urlparse(url)
             return parsed.netloc.replace(":", "_") or "default"
@@ -924,8 +1215,8 @@ class LiveRecorder:
         if storage_state_path:
             return Path(storage_state_path)
         # 自动生成路径
+        # 只算路径；目录由真正写入登录态的地方创建
         domain = auth_domain or LiveRecorder._extract_domain(start_url)
-        DEFAULT_STORAGE_STATE_DIR.mkdir(parents=True, exist_ok=True)
         return DEFAULT_STORAGE_STATE_DIR / f"{domain}.json"
 
     def record(
@@ -937,6 +1228,28 @@ class LiveRecorder:
         storage_state_path: Path | str | None = None,
         save_storage_state: bool = True,
         auth_domain: str | None = None,
+    ) -> Path:
+        """同步入口：在新的事件循环中运行 record_async，参数与返回值相同。"""
+        return asyncio.run(
+            self.record_async(
+                topic=topic,
+                start_url=start_url,
+                out_path=out_path,
+                storage_state_path=storage_state_path,
+                save_storage_state=save_storage_state,
+                auth_domain=auth_domain,
+            )
+        )
+
+    async def record_async(
+        self,
+        *,
+        topic: str,
+        start_url: str,
+        out_path: Path,
+        storage_state_path: Path | str | None = None,
+        save_storage_state: bool = True,
+        auth_domain: str | None = None,
     ) -> Path:
         """
         录制用户操作。
@@ -955,11 +1268,12 @@ class LiveRecorder:
             输出文件路径
         """
         try:
-            from playwright.sync_api import sync_playwright  # type: ignore[import-not-found]
+            from playwright.async_api import async_playwright  # type: ignore[import-not-found]
         except Exception as e:  # pragma: no cover
             raise RuntimeError(
                 "缺少依赖 playwright。请先安装：pip install -e '.[recorder]' 或 pip install playwright，并运行：playwright install chromium"
             ) from e
+        _patch_playwright_stack()
 
         # 解析 storage state 路径
         resolved_storage_path = self._resolve_storage_state_path(
@@ -968,54 +1282,33 @@ class LiveRecorder:
             auth_domain=auth_domain,
         )
 
-        stop = {"value": False}
-
-        def on_event(obj: Any) -> None:
-            if not isinstance(obj, dict):
-                return
-            kind = str(obj.get("kind") or "").strip()
-            url = obj.get("url")
-            url = normalize_text(url) if isinstance(url, str) and url.strip() else None
-
-            target_text = obj.get("targetText")
-            target_text = normalize_text(target_text) if isinstance(target_text, str) and target_text.strip() else None
-
-            target_role = obj.get("targetRole")
-            target_role = normalize_text(target_role) if isinstance(target_role, str) and target_role.strip() else None
-
-            target_label = obj.get("targetLabel")
-            target_label = normalize_text(target_label) if isinstance(target_label, str) and target_label.strip() else None
-
-            value = obj.get("value")
-            value = str(value) if isinstance(value, (str, int, float)) else None
-
-            meta: dict[str, Any] = {}
-            # 基础字段
-            for k in ("tagName", "inputType"):
-                if k in obj and isinstance(obj.get(k), str) and str(obj.get(k)).strip():
-                    meta[k] = normalize_text(str(obj.get(k)))
+        stop_event = asyncio.Event()
+        nav_event = asyncio.Event()
 
-            # 增强字段：稳定定位信息
-            for k in ("selector", "testId", "componentType", "dataAttrs", "parentContext", "directText", "treeNode", "tableCell", "selectedOption"):
-                v = obj.get(k)
-                if v is not None:
-                    meta[k] = v
+        # binding 回调只把原始事件入队立即返回，由 drain 任务批量规整；navigate 事件也走同一队列，保证先后顺序
+        pending: deque[tuple[Any, int]] = deque()
+        drain_wakeup = asyncio.Event()
 
-            self._events.append(
-                _Event(
-                    kind=kind,
-                    url=url,
-                    target_text=target_text,
-                    target_role=target_role,
-                    target_label=target_label,
-                    value=value,
-                    meta=meta,
-                    ts=time.time(),
-                )
-            )
-
-        def request_stop() -> None:
-            stop["value"] = True
+        # binding 回调直接按 Playwright 的 (source, *args) 签名定义，省掉一层 lambda 转发
+        def on_events(_source: Any, batch: Any) -> None:
+            if not isinstance(batch, list):
+                return
+            # 每个事件用 JS 侧记录的发生时刻，而不是整批到达的时刻
+            arrival = time.monotonic_ns()
+            event_ts = self._event_ts
+            pending.extend((obj, event_ts(obj, arrival)) for obj in batch)
+            drain_wakeup.set()
+
+        def drain_pending() -> None:
+            events = self._events
+            while pending:
+                obj, ts = pending.popleft()
+                event = obj if isinstance(obj, _Event) else _event_from_js(obj, ts)
+                if event is not None:
+                    events.append(event)
+
+        def request_stop(_source: Any = None) -> None:
+            stop_event.set()
 
         def on_nav(url: str) -> None:
             u = normalize_text(url) if url else ""
@@ -1025,7 +1318,9 @@ class LiveRecorder:
                 return
             self._last_nav_url = u
             self._pending_snapshot_url = u  # 标记需要捕获快照
-            self._events.append(
+            nav_event.set()
+            ts = time.monotonic_ns()
+            pending.append((
                 _Event(
                     kind="navigate",
                     url=u,
@@ -1034,49 +1329,61 @@ class LiveRecorder:
                     target_label=None,
                     value=None,
                     meta={},
-                    ts=time.time(),
-                )
+                    ts=ts,
+                ),
+                ts,
+            ))
+            drain_wakeup.set()
+
+        async with async_playwright() as p:
+            # 登录态文件检查放到线程里，与浏览器启动并行
+            storage_exists, browser = await asyncio.gather(
+                asyncio.to_thread(resolved_storage_path.exists),
+                p.chromium.launch(headless=False),
             )
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=False)
-
             # 加载或创建 context（支持 storageState）
             storage_loaded = False
-            if resolved_storage_path.exists():
+            if storage_exists:
                 try:
-                    context = browser.new_context(storage_state=str(resolved_storage_path))
+                    context = await browser.new_context(storage_state=str(resolved_storage_path))
                     storage_loaded = True
                     logger.info(f"已加载登录态: {resolved_storage_path}")
                 except Exception as e:
                     logger.warning(f"加载登录态失败，使用空白上下文: {e}")
-                    context = browser.new_context()
+                    context = await browser.new_context()
             else:
-                context = browser.new_context()
+                context = await browser.new_context()
                 logger.info(f"登录态文件不存在，首次录制后会保存到: {resolved_storage_path}")
 
-            context.add_init_script(_INIT_SCRIPT)
-            page = context.new_page()
+            await context.add_init_script(_INIT_SCRIPT)
+            page = await context.new_page()
 
             # JS -> Python
-            page.expose_binding("exogram_record_event", lambda _src, obj: on_event(obj))
-            page.expose_binding("exogram_stop_recording", lambda _src: request_stop())
+            await page.expose_binding("exogram_record_events", on_events)
+            await page.expose_binding("exogram_stop_recording", request_stop)
+
+            main_frame = page.main_frame
 
-            page.on("close", lambda: request_stop())
-            page.on("framenavigated", lambda frame: on_nav(frame.url) if frame == page.main_frame else None)
+            def on_frame_nav(frame: Any) -> None:
+                if frame is main_frame:
+                    on_nav(frame.url)
+
+            page.on("close", request_stop)
+            page.on("framenavigated", on_frame_nav)
 
             # 初始打开
             if start_url and start_url != "about:blank":
                 try:
-                    page.goto(start_url, wait_until="domcontentloaded")
+                    await page.goto(start_url, wait_until="domcontentloaded")
                 except Exception:
                     # 有些站点会阻止自动 goto；不致命，用户仍可手动输入
                     pass
 
             # 兜底：强制再挂一次按钮（某些页面 early script 时机不稳定）
             try:
-                page.wait_for_timeout(200)
-                page.evaluate(_FORCE_MOUNT_UI)
+                await asyncio.sleep(0.2)
+                await page.evaluate(_FORCE_MOUNT_UI)
             except Exception:
                 pass
 
@@ -1086,50 +1393,72 @@ class LiveRecorder:
             except Exception:
                 pass
 
-            # 用于追踪待捕获快照的时间
-            snapshot_wait_start: float | None = None
-            
-            while not stop["value"]:
-                # 给浏览器事件循环让步
-                page.wait_for_timeout(120)
-
+            async def periodic_mount() -> None:
                 # 兜底：某些 SPA 会清掉 document，这里周期性确保按钮仍在
-                try:
-                    page.evaluate(_FORCE_MOUNT_UI)
-                except Exception:
-                    pass
-                
-                # 捕获页面快照：在 navigate 后等待页面稳定，然后捕获
-                if self._pending_snapshot_url:
-                    if snapshot_wait_start is None:
-                        snapshot_wait_start = time.time()
-                    elif time.time() - snapshot_wait_start >= 1.0:  # 等待 1 秒让页面稳定
-                        try:
-                            snapshot = page.evaluate("window.__exogram_get_page_snapshot__()")
-                            if snapshot:
-                                self._page_snapshots[self._pending_snapshot_url] = snapshot
-                        except Exception:
-                            pass  # 页面可能正在加载，忽略错误
-                        self._pending_snapshot_url = None
-                        snapshot_wait_start = None
+                while True:
+                    await asyncio.sleep(0.12)
+                    try:
+                        await page.evaluate(_FORCE_MOUNT_UI)
+                    except Exception:
+                        pass
+
+            async def snapshot_watcher() -> None:
+                # 捕获页面快照：在 navigate 后等待页面稳定，然后捕获（期间再次跳转则捕获最新的 URL）
+                while True:
+                    await nav_event.wait()
+                    nav_event.clear()
+                    await asyncio.sleep(1.0)  # 等待 1 秒让页面稳定
+                    url = self._pending_snapshot_url
+                    if not url:
+                        continue
+                    # 回到已捕获过的 URL 且页面签名（URL/标题/可交互标签数量）未变时，JS 侧不再生成快照，沿用已有的
+                    last_sig = self._snapshot_sigs.get(url) if url in self._page_snapshots else None
+                    try:
+                        result = await page.evaluate("sig => window.__exogram_snapshot_if_changed__(sig)", last_sig)
+                        snapshot = result.get("snapshot") if isinstance(result, dict) else None
+                        if snapshot:
+                            self._page_snapshots[url] = snapshot
+                            self._snapshot_sigs[url] = result.get("sig")
+                    except Exception:
+                        pass  # 页面可能正在加载，忽略错误
+                    self._pending_snapshot_url = None
+
+            async def drain_loop() -> None:
+                while True:
+                    await drain_wakeup.wait()
+                    drain_wakeup.clear()
+                    drain_pending()
+
+            tasks = [
+                asyncio.create_task(periodic_mount()),
+                asyncio.create_task(snapshot_watcher()),
+                asyncio.create_task(drain_loop()),
+            ]
+            try:
+                await stop_event.wait()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                drain_pending()
 
             # 保存登录态
             if save_storage_state:
                 try:
                     resolved_storage_path.parent.mkdir(parents=True, exist_ok=True)
-                    context.storage_state(path=str(resolved_storage_path))
+                    await context.storage_state(path=str(resolved_storage_path))
                     logger.info(f"已保存登录态: {resolved_storage_path}")
                 except Exception as e:
                     logger.error(f"保存登录态失败: {e}")
 
             try:
-                context.close()
+                await context.close()
             finally:
-                browser.close()
+                await browser.close()
 
         doc = RawStepsDocument(topic=topic, source="live-recorder:playwright", steps=self._build_steps())
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(doc.model_dump_json(indent=2, exclude_none=True), encoding="utf-8")
+        payload = doc.model_dump_json(indent=2, exclude_none=True).encode("utf-8")
+        await asyncio.to_thread(_write_bytes, out_path, payload)
         return out_path
 
     @staticmethod
@@ -1157,6 +1486,7 @@ class LiveRecorder:
             raise RuntimeError(
                 "缺少依赖 playwright。请先安装：pip install -e '.[recorder]' 或 pip install playwright，并运行：playwright install chromium"
             ) from e
+        _patch_playwright_stack()
 
         resolved_path = LiveRecorder._resolve_storage_state_path(
             storage_state_path=storage_state_path,
@@ -1200,22 +1530,68 @@ class LiveRecorder:
 
         return resolved_path
 
+    def _wall_ts(self, ns: int) -> float:
+        return self._wall_base + (ns - self._mono_base) / 1e9
+
+    def _event_ts(self, obj: Any, arrival: int) -> int:
+        """JS 事件的 t（epoch 毫秒）换算为单调时钟纳秒；缺失时用到达时刻，且不晚于到达时刻。"""
+        t = obj.get("t") if isinstance(obj, dict) else None
+        if not isinstance(t, (int, float)) or isinstance(t, bool):
+            return arrival
+        return min(arrival, self._mono_base + int((t / 1000 - self._wall_base) * 1e9))
+
     def _build_steps(self) -> list[RawStep]:
+        wall_ts = self._wall_ts
         steps: list[RawStep] = []
         # 轻量聚合：连续的 input 事件（同 url+selector）合并成一次 type
         # 改进：用 selector 作为更精确的标识，增大时间窗口
         last_type_sig: tuple[str | None, str | None] | None = None
-        last_type_ts: float | None = None
+        last_type_ts: int | None = None
+        # 当前 type 步骤及其最后一个 input 事件：脱敏/截断只对合并后的最终值做一次
+        type_step: RawStep | None = None
+        type_last: _Event | None = None
 
         for ev in self._events:
-            kind = (ev.kind or "").lower()
+            kind = ev.kind
+            if kind not in ("navigate", "click", "input"):
+                # 其他未知事件：忽略（MVP）
+                continue
+
+            if kind == "input":
+                # 改进：使用 selector 作为更精确的标识（selector 比 label 更能唯一标识一个输入框）
+                selector = ev.meta.get("selector")
+                sig = (ev.url, selector or ev.target_label or ev.target_role)
+
+                # 改进：增大时间窗口到 5 秒（用户连续打字的合理间隔）
+                # 同一个输入框的连续输入应该合并为一条记录
+                should_merge = (
+                    type_step is not None
+                    and last_type_sig == sig
+                    and last_type_ts is not None
+                    and (ev.ts - last_type_ts) <= _TYPE_MERGE_WINDOW_NS  # 从 0.8 秒增加到 5 秒
+                )
+
+                if should_merge:
+                    # 仅更新 value 和结束时间戳（保留最早的 label/role 和开始时间）
+                    # 保留原始 ts（开始时间），添加 ts_end（结束时间）
+                    type_step.meta.update(ev.meta)
+                    type_step.meta["ts_end"] = wall_ts(ev.ts)
+                    type_last = ev
+                    last_type_ts = ev.ts
+                    continue
+
+            # 新步骤开始：先落定上一个 type 步骤的值
+            if type_step is not None:
+                type_step.value = _input_preview(type_last)
+                type_step = type_last = None
+
             if kind == "navigate":
                 # 添加页面快照到 meta（如果有）
-                nav_meta: dict[str, Any] = {"ts": ev.ts}
+                nav_meta: dict[str, Any] = {"ts": wall_ts(ev.ts)}
                 if ev.url and ev.url in self._page_snapshots:
                     snapshot = self._page_snapshots[ev.url]
                     nav_meta["page_snapshot"] = snapshot
-                
+
                 steps.append(
                     RawStep(
                         idx=len(steps),
@@ -1238,58 +1614,30 @@ class LiveRecorder:
                         target_role=ev.target_role,
                         target_label=ev.target_label,
                         value=None,
-                        meta={**ev.meta, "ts": ev.ts},
+                        meta={**ev.meta, "ts": wall_ts(ev.ts)},
                     )
                 )
                 last_type_sig = None
                 last_type_ts = None
                 continue
 
-            if kind == "input":
-                input_type = str(ev.meta.get("inputType") or "") or None
-                masked = _mask_value(ev.value, input_type=input_type)
-                masked = safe_preview_value(masked, limit=80)
-
-                # 改进：使用 selector 作为更精确的标识（selector 比 label 更能唯一标识一个输入框）
-                selector = ev.meta.get("selector")
-                sig = (ev.url, selector or ev.target_label or ev.target_role)
-                
-                # 改进：增大时间窗口到 5 秒（用户连续打字的合理间隔）
-                # 同一个输入框的连续输入应该合并为一条记录
-                should_merge = (
-                    steps
-                    and steps[-1].action == "type"
-                    and last_type_sig == sig
-                    and last_type_ts is not None
-                    and (ev.ts - last_type_ts) <= 5.0  # 从 0.8 秒增加到 5 秒
-                )
-
-                if should_merge:
-                    # 仅更新 value 和结束时间戳（保留最早的 label/role 和开始时间）
-                    steps[-1].value = masked
-                    # 保留原始 ts（开始时间），添加 ts_end（结束时间）
-                    orig_meta = steps[-1].meta or {}
-                    steps[-1].meta = {**orig_meta, **ev.meta, "ts_end": ev.ts}
-                    last_type_ts = ev.ts
-                    continue
-
-                steps.append(
-                    RawStep(
-                        idx=len(steps),
-                        action="type",
-                        url=ev.url,
-                        target_text=None,
-                        target_role=ev.target_role,
-                        target_label=ev.target_label,
-                        value=masked,
-                        meta={**ev.meta, "ts": ev.ts},
-                    )
-                )
-                last_type_sig = sig
-                last_type_ts = ev.ts
-                continue
+            type_step = RawStep(
+                idx=len(steps),
+                action="type",
+                url=ev.url,
+                target_text=None,
+                target_role=ev.target_role,
+                target_label=ev.target_label,
+                value=None,
+                meta={**ev.meta, "ts": wall_ts(ev.ts)},
+            )
+            type_last = ev
+            steps.append(type_step)
+            last_type_sig = sig
+            last_type_ts = ev.ts
 
-            # 其他未知事件：忽略（MVP）
+        if type_step is not None:
+            type_step.value = _input_preview(type_last)
 
         # 重新编号兜底（防止未来中途删除导致 idx 不连续）
         for i, s in enumerate(steps):
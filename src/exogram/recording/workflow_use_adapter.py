@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Any
 
 from exogram.models import RawStep, RawStepsDocument
-from exogram.utils import normalize_text, safe_preview_value
+from exogram.utils import json_loads, normalize_text, safe_preview_value
 
 
 class WorkflowUseJsonAdapter:
@@ -18,11 +17,21 @@ class WorkflowUseJsonAdapter:
     - 对未知 schema 尽量容错（不同版本字段可能变化）
     """
 
+    # 各字段的候选 key（按优先级）
+    _TEXT_KEYS = ("text", "visibleText", "label", "ariaLabel", "name", "title", "buttonText", "linkText")
+    _ROLE_KEYS = ("role", "ariaRole", "elementRole")
+    _LABEL_KEYS = ("placeholder", "inputLabel", "fieldLabel")
+    _SELECTOR_KEYS = ("selector", "css", "xpath", "selectorHint")
+    _VALUE_KEYS = ("value", "input", "typedText", "textToType")
+    _WAIT_KEYS = ("waitMs", "timeoutMs", "delayMs")
+    _ERROR_KEYS = ("error", "exception", "message")
+    _META_KEYS = ("strategy", "confidence", "retries", "note")
+
     def __init__(self) -> None:
         pass
 
     def load(self, path: Path, *, topic: str) -> RawStepsDocument:
-        data = json.loads(path.read_text(encoding="utf-8"))
+        data = json_loads(path.read_bytes())
         steps = self._extract_steps(data)
         raw_steps: list[RawStep] = []
         for idx, step in enumerate(steps):
@@ -53,23 +62,17 @@ class WorkflowUseJsonAdapter:
         raise ValueError("无法在 workflow JSON 中找到 steps 列表（schema 不匹配）。")
 
     def _find_step_list(self, obj: Any) -> list[dict[str, Any]] | None:
-        if isinstance(obj, list):
-            if obj and all(isinstance(x, dict) for x in obj):
-                if any(("action" in x or "type" in x or "op" in x) for x in obj):
-                    return obj  # type: ignore[return-value]
-            for x in obj:
-                found = self._find_step_list(x)
-                if found is not None:
-                    return found
-            return None
-
-        if isinstance(obj, dict):
-            for v in obj.values():
-                found = self._find_step_list(v)
-                if found is not None:
-                    return found
-            return None
-
+        # 显式栈做先序深度优先遍历（与递归版的查找顺序一致），深层嵌套也不会触发 RecursionError
+        stack = [obj]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                if node and all(isinstance(x, dict) for x in node):
+                    if any(("action" in x or "type" in x or "op" in x) for x in node):
+                        return node  # type: ignore[return-value]
+                stack.extend(reversed(node))
+            elif isinstance(node, dict):
+                stack.extend(reversed(node.values()))
         return None
 
     def _normalize_step(self, idx: int, step: dict[str, Any]) -> RawStep:
@@ -88,36 +91,23 @@ class WorkflowUseJsonAdapter:
         else:
             url = None
 
-        target_text = self._pick_first_str(
-            step,
-            [
-                "text",
-                "visibleText",
-                "label",
-                "ariaLabel",
-                "name",
-                "title",
-                "buttonText",
-                "linkText",
-            ],
-        )
-
-        target_role = self._pick_first_str(step, ["role", "ariaRole", "elementRole"])
-        target_label = self._pick_first_str(step, ["placeholder", "inputLabel", "fieldLabel"])
+        target_text = self._pick_first_str(step, self._TEXT_KEYS)
+        target_role = self._pick_first_str(step, self._ROLE_KEYS)
+        target_label = self._pick_first_str(step, self._LABEL_KEYS)
 
-        selector_hint = self._pick_first_str(step, ["selector", "css", "xpath", "selectorHint"])
+        selector_hint = self._pick_first_str(step, self._SELECTOR_KEYS)
         if selector_hint:
             selector_hint = safe_preview_value(selector_hint, limit=120)
 
-        value = self._pick_first_str(step, ["value", "input", "typedText", "textToType"])
+        value = self._pick_first_str(step, self._VALUE_KEYS)
         value = safe_preview_value(value, limit=80)
 
-        wait_ms = self._pick_first_int(step, ["waitMs", "timeoutMs", "delayMs"])
-        error = self._pick_first_str(step, ["error", "exception", "message"])
+        wait_ms = self._pick_first_int(step, self._WAIT_KEYS)
+        error = self._pick_first_str(step, self._ERROR_KEYS)
 
         # 保留少量 meta，方便后续演进；但避免塞入整段 DOM/截图 base64
         meta: dict[str, Any] = {}
-        for k in ("strategy", "confidence", "retries", "note"):
+        for k in self._META_KEYS:
             if k in step:
                 meta[k] = step[k]
 
@@ -135,16 +125,21 @@ class WorkflowUseJsonAdapter:
             meta=meta,
         )
 
-    def _pick_first_str(self, step: dict[str, Any], keys: list[str]) -> str | None:
+    def _pick_first_str(self, step: dict[str, Any], keys: tuple[str, ...]) -> str | None:
+        get = step.get
         for k in keys:
-            v = step.get(k)
-            if isinstance(v, str) and v.strip():
-                return normalize_text(v)
+            v = get(k)
+            if isinstance(v, str):
+                # 空白串规整后为空，继续找下一个 key
+                v = normalize_text(v)
+                if v:
+                    return v
         return None
 
-    def _pick_first_int(self, step: dict[str, Any], keys: list[str]) -> int | None:
+    def _pick_first_int(self, step: dict[str, Any], keys: tuple[str, ...]) -> int | None:
+        get = step.get
         for k in keys:
-            v = step.get(k)
+            v = get(k)
             if isinstance(v, int):
                 return v
             if isinstance(v, str) and v.isdigit():
@@ -2,21 +2,38 @@ from __future__ import annotations
 
 import json
 import logging
-import re
+import os
+import tempfile
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # 可选加速依赖：pip install exogram[speedups]
+    orjson = None
 
+__all__ = [
+    "ensure_dir",
+    "get_logger",
+    "json_dumps",
+    "json_loads",
+    "normalize_text",
+    "read_json",
+    "safe_preview_value",
+    "write_json",
+]
+
+
+@lru_cache(maxsize=None)
 def get_logger(name: str) -> logging.Logger:
     """
-    获取一个配置好的 logger 实例。
+    获取一个配置好的 logger 实例（按名称缓存，配置只做一次）。
     
     日志格式：[模块名] 消息
     默认日志级别：INFO
     
     可通过设置环境变量 EXOGRAM_LOG_LEVEL 来调整日志级别。
     """
-    import os
-    
     logger = logging.getLogger(name)
     
     # 避免重复添加 handler
@@ -38,26 +55,69 @@ def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
+def json_loads(data: str | bytes):
+    """解析 JSON；安装了 orjson 时走 C 实现，否则回退 stdlib（两者都抛 json.JSONDecodeError）。"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: object, *, indent: bool = False, sort_keys: bool = False) -> str:
+    """
+    序列化 JSON（保留非 ASCII 字符）。
+
+    indent=False 时为紧凑格式；indent=True 时为 2 空格缩进，与 json.dumps(indent=2) 一致。
+    两种实现输出相同，可用于生成缓存 key。
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2, sort_keys=sort_keys)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys)
+
+
 def read_json(path: Path) -> dict:
-    return json.loads(path.read_text(encoding="utf-8"))
+    return json_loads(path.read_bytes())
 
 
 def write_json(path: Path, obj: object) -> None:
-    path.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    path.write_text(json_dumps(obj, indent=True), encoding="utf-8")
 
 
-_WS_RE = re.compile(r"\s+")
+def atomic_write_text(path: Path, content: str) -> None:
+    """先写同目录临时文件再 os.replace：并发写入或中途中断都不会留下半截文件，失败时清理临时文件。"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem[:16]}-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
 
 
 def normalize_text(s: str) -> str:
-    s = s.strip()
-    s = _WS_RE.sub(" ", s)
-    return s
+    # str.split() 按 Unicode 空白切分并丢弃首尾空白，与 strip + re.sub(r"\s+", " ") 等价，但不走正则引擎
+    return " ".join(s.split())
 
 
 def safe_preview_value(value: str | None, limit: int = 80) -> str | None:
     if value is None:
         return None
+    # 快速路径：短且已规整（除单个空格外的空白字符都不是 printable）
+    if (
+        len(value) <= limit
+        and value.isprintable()
+        and "  " not in value
+        and value[:1] != " "
+        and value[-1:] != " "
+    ):
+        return value
     v = normalize_text(value)
     if len(v) > limit:
         return v[:limit] + "…"
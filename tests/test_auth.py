@@ -10,6 +10,7 @@ import pytest
 from exogram.execution.auth import (
     CDP_INCOMPATIBLE_COOKIE_FIELDS,
     _clean_cookie_for_cdp,
+    clear_auth_path_cache,
     get_auth_file_path,
     get_cdp_compatible_auth_file,
     list_available_auth_domains,
@@ -74,6 +75,17 @@ class TestGetAuthFilePath:
             )
             assert result == auth_file
 
+    def test_skips_hidden_files_in_org_scan(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            auth_dir = Path(tmpdir)
+            (auth_dir / ".sso.example.com.json").write_text("{}")
+
+            result = get_auth_file_path(
+                "https://app.example.com",
+                auth_dir=auth_dir,
+            )
+            assert result is None
+
     def test_finds_base_domain_match(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             auth_dir = Path(tmpdir)
@@ -98,6 +110,26 @@ class TestGetAuthFilePath:
             )
             assert result == auth_file
 
+    def test_exact_match_preferred_over_base(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            auth_dir = Path(tmpdir)
+            (auth_dir / "example.com.json").write_text("{}")
+            exact = auth_dir / "app.example.com.json"
+            exact.write_text("{}")
+
+            assert get_auth_file_path("https://app.example.com/", auth_dir=auth_dir) == exact
+
+    def test_sees_files_added_after_lookup(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            auth_dir = Path(tmpdir)
+            assert get_auth_file_path("https://example.com", auth_dir=auth_dir) is None
+
+            auth_file = auth_dir / "example.com.json"
+            auth_file.write_text("{}")
+            clear_auth_path_cache()  # 兼容 mtime 精度较粗的文件系统
+
+            assert get_auth_file_path("https://example.com", auth_dir=auth_dir) == auth_file
+
 
 class TestListAvailableAuthDomains:
     """Tests for list_available_auth_domains function."""
@@ -119,6 +151,17 @@ class TestListAvailableAuthDomains:
             assert "example.com" in result
             assert "test.com" in result
 
+    def test_sees_added_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            auth_dir = Path(tmpdir)
+            (auth_dir / "example.com.json").write_text("{}")
+            (auth_dir / ".hidden.json").write_text("{}")
+            assert list_available_auth_domains(auth_dir=auth_dir) == ["example.com"]
+
+            (auth_dir / "test.com.json").write_text("{}")
+            clear_auth_path_cache()  # 目录 mtime 精度不足时手动失效
+            assert sorted(list_available_auth_domains(auth_dir=auth_dir)) == ["example.com", "test.com"]
+
 
 class TestGetCdpCompatibleAuthFile:
     """Tests for get_cdp_compatible_auth_file function."""
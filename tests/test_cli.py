@@ -0,0 +1,101 @@
+"""Tests for exogram.cli module."""
+from __future__ import annotations
+
+import json
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from exogram.cli import _cognition_to_fields, _cognition_to_record, _load_cognition
+from exogram.models import CognitionRecord
+
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class TestCognitionToRecord:
+    """Tests for _cognition_to_record function."""
+
+    def test_projects_fields(self):
+        cog = {
+            "_meta": {"id": "cog-1", "topic": "Demo", "source": "demo.raw_steps.json"},
+            "task": {"summary": "查询日志", "goal": "找到操作日志"},
+            "key_elements": [{"name": "搜索按钮"}],
+            "operation_knowledge": {"form_filling_tips": ["先选时间"], "precautions": ["注意分页"]},
+        }
+        record = _cognition_to_record(cog, default_topic="fallback", now=NOW)
+        assert record.id == "cog-1"
+        assert record.topic == "Demo"
+        assert record.source_recording == "demo.raw_steps.json"
+        assert record.task_tags == ["查询日志"]
+        assert record.key_path_features == ["搜索按钮"]
+        assert record.preference_rules == ["先选时间"]
+        assert record.exception_handling == ["注意分页"]
+        assert record.summary == "找到操作日志"
+
+    def test_missing_meta_uses_defaults(self):
+        record = _cognition_to_record({}, default_topic="fallback", now=NOW)
+        assert record.topic == "fallback"
+        assert record.created_at == NOW
+        assert record.id
+
+    def test_created_at_iso_string(self):
+        cog = {"_meta": {"created_at": "2024-06-01T12:00:00+00:00"}}
+        record = _cognition_to_record(cog, default_topic="t", now=NOW)
+        assert record.created_at == datetime(2024, 6, 1, 12, tzinfo=timezone.utc)
+
+    def test_created_at_epoch_seconds(self):
+        cog = {"_meta": {"created_at": 1717243200}}
+        record = _cognition_to_record(cog, default_topic="t", now=NOW)
+        assert record.created_at == datetime(2024, 6, 1, 12, tzinfo=timezone.utc)
+
+    def test_fields_projection_matches_record(self):
+        cog = {
+            "_meta": {"id": "cog-1", "topic": "Demo", "created_at": "2024-06-01T12:00:00+00:00"},
+            "task": {"summary": "查询日志", "goal": "找到操作日志"},
+            "key_elements": [{"name": "搜索按钮"}],
+        }
+        fields = _cognition_to_fields(cog, default_topic="t", now=NOW.isoformat())
+        record = _cognition_to_record(cog, default_topic="t", now=NOW)
+        assert record.model_dump(mode="json") == CognitionRecord.model_validate(fields).model_dump(mode="json")
+
+
+def _rich_cognition(topic: str) -> dict:
+    return {
+        "website": {"name": topic, "url": "https://example.com", "type": "内部系统", "description": "d"},
+        "task": {"summary": "s", "goal": "g", "steps_count": 1},
+        "operation_flow": [],
+        "key_elements": [{"name": "搜索", "type": "button", "usage": "点击"}],
+        "operation_knowledge": {"navigation_pattern": "菜单"},
+        "replication_guide": "",
+        "_meta": {
+            "id": topic,
+            "topic": topic,
+            "created_at": "2025-01-01T00:00:00+00:00",
+            "source": "test",
+            "steps_count": 1,
+        },
+    }
+
+
+class TestLoadCognition:
+    """Tests for _load_cognition function."""
+
+    def test_loads_record(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "A.cognition.json"
+            path.write_text(json.dumps(_rich_cognition("A"), ensure_ascii=False), encoding="utf-8")
+
+            record = _load_cognition(path)
+
+            assert record.meta.topic == "A"
+            assert record.key_elements[0].name == "搜索"
+
+    def test_reflects_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "A.cognition.json"
+            path.write_text(json.dumps(_rich_cognition("A"), ensure_ascii=False), encoding="utf-8")
+            assert _load_cognition(path).meta.topic == "A"
+
+            path.write_text(json.dumps(_rich_cognition("B"), ensure_ascii=False), encoding="utf-8")
+            assert _load_cognition(path).meta.topic == "B"
@@ -0,0 +1,43 @@
+"""Tests for exogram.config module."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from exogram.config import load_settings
+
+
+@pytest.fixture(autouse=True)
+def _clear_settings_cache():
+    load_settings.cache_clear()
+    yield
+    load_settings.cache_clear()
+
+
+class TestLoadSettings:
+    """Tests for load_settings function."""
+
+    def test_reads_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("EXOGRAM_DATA_DIR", str(tmp_path))
+        monkeypatch.setenv("EXOGRAM_LLM_MAX_TOKENS", "1024")
+        settings = load_settings()
+        assert settings.data_dir == tmp_path.resolve()
+        assert settings.llm_max_tokens == 1024
+
+    def test_returns_cached_instance(self):
+        assert load_settings() is load_settings()
+
+    def test_cache_clear_picks_up_env_changes(self, monkeypatch):
+        monkeypatch.setenv("EXOGRAM_DISTILL_MODEL", "model-a")
+        assert load_settings().distill_model == "model-a"
+
+        monkeypatch.setenv("EXOGRAM_DISTILL_MODEL", "model-b")
+        assert load_settings().distill_model == "model-a"
+
+        load_settings.cache_clear()
+        assert load_settings().distill_model == "model-b"
+
+    def test_default_data_dir_is_absolute(self, monkeypatch):
+        monkeypatch.delenv("EXOGRAM_DATA_DIR", raising=False)
+        assert load_settings().data_dir == Path("./data").resolve()
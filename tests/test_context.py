@@ -0,0 +1,54 @@
+"""Tests for exogram.execution.context module."""
+from __future__ import annotations
+
+from exogram.execution.context import SAFE_MODE_INSTRUCTION, CognitiveContextManager, build_agent_task
+from exogram.models_rich import RichCognitionRecord
+
+
+def _make_record() -> RichCognitionRecord:
+    return RichCognitionRecord.model_validate({
+        "website": {"name": "测试系统", "type": "项目管理系统", "description": "描述"},
+        "task": {"summary": "完成了登录操作", "goal": "登录系统", "steps_count": 3},
+        "operation_flow": [],
+        "key_elements": [{"name": "登录按钮", "type": "按钮", "usage": "点击进行登录"}],
+        "operation_knowledge": {
+            "navigation_pattern": "直接访问登录页",
+            "precautions": ["注意密码大小写"],
+        },
+        "replication_guide": "访问登录页，输入凭据，点击登录。",
+        "_meta": {
+            "id": "test-id",
+            "topic": "Login",
+            "created_at": "2024-01-01T00:00:00+00:00",
+            "source": "test-source",
+            "steps_count": 3,
+        },
+    })
+
+
+class TestBuildSystemInstruction:
+    """Tests for CognitiveContextManager.build_system_instruction."""
+
+    def test_includes_record_sections(self):
+        text = CognitiveContextManager(_make_record()).build_system_instruction()
+        assert "你正在操作 测试系统 (项目管理系统)。" in text
+        assert "- [按钮] 登录按钮: 点击进行登录" in text
+        assert "- ⚠️ 注意密码大小写" in text
+        assert "【参考流程】" in text
+
+    def test_result_is_reused(self):
+        manager = CognitiveContextManager(_make_record())
+        first = manager.build_system_instruction()
+        assert manager.build_system_instruction() is first
+
+
+class TestBuildAgentTask:
+    """Tests for build_agent_task function."""
+
+    def test_start_url_and_safe_mode(self):
+        text = build_agent_task(task="  查询订单 ", start_url="https://example.com")
+        assert text == "首先打开网址: https://example.com\n\n查询订单\n\n" + SAFE_MODE_INSTRUCTION
+
+    def test_with_wisdom(self):
+        text = build_agent_task(task="查询订单", wisdom="先登录", safe_mode=False)
+        assert text == "查询订单\n\n\n【认知指导】\n先登录"
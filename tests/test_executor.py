@@ -0,0 +1,58 @@
+"""Tests for exogram.execution.executor module."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from exogram.execution.executor import Executor, HistorySummary, RunResult
+
+
+def _make_executor() -> Executor:
+    return Executor(
+        model="test-model",
+        openai_api_key="sk-test",
+        openai_base_url=None,
+        openai_timeout=1.0,
+        openai_max_retries=0,
+        temperature=0.0,
+        max_completion_tokens=16,
+        start_url="https://example.com",
+    )
+
+
+class TestRunBatch:
+    """Tests for Executor.run_batch method."""
+
+    @pytest.fixture
+    def executor(self, monkeypatch):
+        executor = _make_executor()
+        calls: list[tuple[str, bool]] = []
+
+        async def fake_run(*, task, wisdom="", navigate_to_start=False, safe_mode=True):
+            calls.append((task, navigate_to_start))
+            summary = HistorySummary(
+                steps=1, is_done=True, is_successful=True, final_url=None, final_result=task,
+            )
+            return RunResult(injected_wisdom=wisdom, summary=summary, history=[task])
+
+        monkeypatch.setattr(executor, "run", fake_run)
+        executor.calls = calls
+        return executor
+
+    def test_preserves_order_and_navigates_to_start(self, executor):
+        results = asyncio.run(executor.run_batch(["a", "b", "c"], wisdom="w"))
+
+        assert [r.summary.final_result for r in results] == ["a", "b", "c"]
+        assert executor.calls == [("a", True), ("b", True), ("c", True)]
+        assert all(r.injected_wisdom == "w" for r in results)
+
+    def test_releases_history_by_default(self, executor):
+        results = asyncio.run(executor.run_batch(["a", "b"]))
+
+        assert all(r.history is None for r in results)
+
+    def test_keep_history(self, executor):
+        results = asyncio.run(executor.run_batch(["a"], keep_history=True))
+
+        assert results[0].history == ["a"]
@@ -0,0 +1,92 @@
+"""Tests for exogram.distillation.cache module."""
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# exogram.distillation 包在导入时会加载 openai / langchain
+pytest.importorskip("openai")
+pytest.importorskip("langchain_openai")
+
+from exogram.distillation.cache import LLMCache, SemanticCache
+
+
+class TestLLMCache:
+    """Tests for LLMCache class."""
+
+    def test_miss_then_hit(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = LLMCache(Path(tmpdir) / "llm_cache")
+            key = LLMCache.make_key({"topic": "T"}, model="gpt-4o")
+
+            assert cache.get(key) is None
+            cache.set(key, '{"ok": true}', model="gpt-4o")
+            assert cache.get(key) == '{"ok": true}'
+            assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_key_is_order_independent_and_model_specific(self):
+        a = LLMCache.make_key({"topic": "T", "steps": "x"}, model="m1")
+        b = LLMCache.make_key({"steps": "x", "topic": "T"}, model="m1")
+        c = LLMCache.make_key({"topic": "T", "steps": "x"}, model="m2")
+        assert a == b
+        assert a != c
+
+    def test_key_depends_on_generation_params(self):
+        base = LLMCache.make_key({"topic": "T"}, model="m", params={"prompt": "p1", "max_tokens": 4096})
+        same = LLMCache.make_key({"topic": "T"}, model="m", params={"max_tokens": 4096, "prompt": "p1"})
+        assert base == same
+        assert base != LLMCache.make_key({"topic": "T"}, model="m", params={"prompt": "p2", "max_tokens": 4096})
+        assert base != LLMCache.make_key({"topic": "T"}, model="m", params={"prompt": "p1", "max_tokens": 2048})
+
+    def test_corrupt_file_is_a_miss(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = LLMCache(Path(tmpdir))
+            key = LLMCache.make_key({}, model="m")
+            (Path(tmpdir) / f"{key}.json").write_text("{broken", encoding="utf-8")
+            assert cache.get(key) is None
+
+    def test_set_leaves_no_temp_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = LLMCache(Path(tmpdir))
+            cache.set("k", "中文输出")
+            assert [p.name for p in Path(tmpdir).iterdir()] == ["k.json"]
+            assert cache.get("k") == "中文输出"
+
+
+class TestSemanticCache:
+    """Tests for SemanticCache class."""
+
+    @staticmethod
+    def _embed(text: str) -> list[float]:
+        # 简单的确定性"embedding"：按关键词计数
+        return [text.count("日志"), text.count("订单"), 1.0]
+
+    def test_similar_text_hits(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = SemanticCache(self._embed, cache_dir=Path(tmpdir), threshold=0.99)
+            cache.add(cache.embed_text("查询日志"), "cached", model="m")
+
+            assert cache.lookup(cache.embed_text("查看日志"), model="m") == "cached"
+            assert cache.lookup(cache.embed_text("查询订单"), model="m") is None
+            assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_model_must_match(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = SemanticCache(self._embed, cache_dir=Path(tmpdir))
+            cache.add(cache.embed_text("日志"), "cached", model="m1")
+            assert cache.lookup(cache.embed_text("日志"), model="m2") is None
+
+    def test_sig_must_match(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = SemanticCache(self._embed, cache_dir=Path(tmpdir))
+            cache.add(cache.embed_text("日志"), "cached", model="m", sig="nav,click")
+            assert cache.lookup(cache.embed_text("日志"), model="m", sig="nav,type") is None
+            assert cache.lookup(cache.embed_text("日志"), model="m", sig="nav,click") == "cached"
+
+    def test_persists_across_instances(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            SemanticCache(self._embed, cache_dir=Path(tmpdir)).add([1.0, 0.0, 0.0], "cached", model="m")
+            cache = SemanticCache(self._embed, cache_dir=Path(tmpdir))
+            assert cache.lookup([1.0, 0.0, 0.0], model="m") == "cached"
@@ -1,13 +1,14 @@
 """Tests for exogram.memory.jsonl_store module."""
 from __future__ import annotations
 
+import logging
 import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
 
-from exogram.memory.jsonl_store import JsonlMemoryStore, _score_record, _tokenize
+from exogram.memory.jsonl_store import JsonlMemoryStore, _tokenize
 from exogram.models import CognitionRecord
 
 
@@ -37,50 +38,60 @@ class TestTokenize:
         assert len(result) > 0
 
 
-class TestScoreRecord:
-    """Tests for _score_record function."""
+class TestRetrieveScoring:
+    """Tests for JsonlMemoryStore.retrieve scoring."""
+
+    @staticmethod
+    def _store(tmpdir: str, *records: CognitionRecord) -> JsonlMemoryStore:
+        store = JsonlMemoryStore(Path(tmpdir) / "memory.jsonl")
+        store.append_many(records)
+        return store
 
     def test_matching_query_gets_positive_score(self):
-        record = CognitionRecord(
-            id="test",
-            topic="项目管理",
-            summary="项目管理系统操作",
-        )
-        score = _score_record(record, query="项目")
-        assert score > 0
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = self._store(
+                tmpdir,
+                CognitionRecord(id="other", topic="报销", summary="费用报销流程"),
+                CognitionRecord(id="test", topic="项目管理", summary="项目管理系统操作"),
+            )
+
+            hits = store.retrieve(topic=None, query="项目")
+            assert hits[0].record.id == "test"
+            assert hits[0].score > 0
 
     def test_non_matching_query_gets_zero_score(self):
-        record = CognitionRecord(
-            id="test",
-            topic="项目管理",
-            summary="项目管理系统操作",
-        )
-        score = _score_record(record, query="完全不相关的查询")
-        assert score == pytest.approx(0, abs=0.1)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = self._store(
+                tmpdir,
+                CognitionRecord(id="test", topic="项目管理", summary="项目管理系统操作"),
+            )
+
+            hits = store.retrieve(topic=None, query="完全不相关的查询")
+            assert [h.record.id for h in hits] == ["test"]
+            assert hits[0].score == pytest.approx(0, abs=0.1)
 
     def test_recency_boost(self):
-        # Recent record should score higher
-        recent_record = CognitionRecord(
-            id="recent",
-            topic="测试",
-            summary="测试内容",
-            created_at=datetime.now(timezone.utc),
-        )
-        
-        # Old record
-        old_record = CognitionRecord(
-            id="old",
-            topic="测试",
-            summary="测试内容",
-        )
-        # Manually set old date
-        old_record.created_at = datetime(2020, 1, 1, tzinfo=timezone.utc)
-        
-        recent_score = _score_record(recent_record, query="测试")
-        old_score = _score_record(old_record, query="测试")
-        
-        # Recent should have higher recency boost
-        assert recent_score > old_score
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = self._store(
+                tmpdir,
+                CognitionRecord(
+                    id="old",
+                    topic="测试",
+                    summary="测试内容",
+                    created_at=datetime(2020, 1, 1, tzinfo=timezone.utc),
+                ),
+                CognitionRecord(
+                    id="recent",
+                    topic="测试",
+                    summary="测试内容",
+                    created_at=datetime.now(timezone.utc),
+                ),
+            )
+
+            hits = store.retrieve(topic=None, query="测试")
+            # 内容相同，新近的记录得分更高
+            assert [h.record.id for h in hits] == ["recent", "old"]
+            assert hits[0].score > hits[1].score
 
 
 class TestJsonlMemoryStore:
@@ -124,6 +135,84 @@ class TestJsonlMemoryStore:
             records = store.list_all()
             assert len(records) == 3
 
+    def test_append_many(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "memory.jsonl"
+            store = JsonlMemoryStore(path)
+            store.append(CognitionRecord(id="first", topic="T", summary="已有"))
+
+            written = store.append_many(
+                CognitionRecord(id=f"batch-{i}", topic="T", summary=f"批量 {i}")
+                for i in range(3)
+            )
+
+            assert written == 3
+            records = store.list_all()
+            assert [r.id for r in records] == ["first", "batch-0", "batch-1", "batch-2"]
+            assert records[1].summary == "批量 0"
+
+    def test_append_many_empty(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "memory.jsonl"
+            store = JsonlMemoryStore(path)
+            assert store.append_many([]) == 0
+            assert store.list_all() == []
+
+    def test_context_manager_keeps_handle_open(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "memory.jsonl"
+            store = JsonlMemoryStore(path)
+
+            with store:
+                store.append(CognitionRecord(id="a", topic="T", summary="S"))
+                # 句柄打开期间写入的内容立即可见
+                assert [r.id for r in store.list_all()] == ["a"]
+                store.append_many([CognitionRecord(id="b", topic="T", summary="S")])
+
+            assert store._fh is None
+            assert [r.id for r in store.list_all()] == ["a", "b"]
+
+    def test_append_raw_many(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "memory.jsonl"
+            store = JsonlMemoryStore(path)
+
+            written = store.append_raw_many([
+                {"id": "raw-1", "topic": "T", "created_at": "2025-01-01T00:00:00+00:00", "summary": "原始写入"},
+            ])
+
+            assert written == 1
+            records = store.list_all()
+            assert records[0].id == "raw-1"
+            assert records[0].summary == "原始写入"
+            assert records[0].created_at == datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    def test_append_raw_many_rejects_invalid_rows(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "memory.jsonl"
+            store = JsonlMemoryStore(path)
+
+            with pytest.raises(ValueError, match="summary"):
+                store.append_raw_many([
+                    {"id": "ok", "topic": "T", "summary": "S"},
+                    {"id": "bad", "topic": "T", "summary": None},
+                ])
+            with pytest.raises(ValueError, match="created_at"):
+                store.append_raw_many([{"id": "bad", "topic": "T", "summary": "S", "created_at": "yesterday"}])
+
+            # 整批拒绝，不写入任何行
+            assert path.read_bytes() == b""
+
+    def test_load_logs_dropped_rows(self, caplog):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "memory.jsonl"
+            path.write_text('{"id": "a", "topic": "T", "summary": "S"}\n{"id": "b"}\n', encoding="utf-8")
+            store = JsonlMemoryStore(path)
+
+            with caplog.at_level(logging.WARNING):
+                assert [r.id for r in store.list_all()] == ["a"]
+            assert "1 行无法解析" in caplog.text
+
     def test_retrieve_by_topic(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             path = Path(tmpdir) / "memory.jsonl"
@@ -145,6 +234,20 @@ class TestJsonlMemoryStore:
             assert len(hits) == 1
             assert hits[0].record.topic == "TopicA"
 
+    def test_retrieve_sees_appended_records(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "memory.jsonl"
+            store = JsonlMemoryStore(path)
+            store.append(CognitionRecord(id="a", topic="T", summary="Content A"))
+
+            first = store.retrieve(topic=None, query="Content")
+            assert [h.record.id for h in first] == ["a"]
+            # 文件未变时复用已解析的记录
+            assert store.list_all()[0] is first[0].record
+
+            store.append(CognitionRecord(id="b", topic="T", summary="Content B"))
+            assert {h.record.id for h in store.retrieve(topic=None, query="Content")} == {"a", "b"}
+
     def test_retrieve_with_limit(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             path = Path(tmpdir) / "memory.jsonl"
@@ -182,6 +285,18 @@ class TestJsonlMemoryStore:
                 # Higher score should come first
                 assert hits[0].score >= hits[1].score
 
+    def test_retrieve_ranks_by_term_frequency(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "memory.jsonl"
+            store = JsonlMemoryStore(path)
+            for i in range(1, 4):
+                store.append(CognitionRecord(id=f"tf-{i}", topic="T", summary="项目 " * i + "其他" * (4 - i)))
+            store.append(CognitionRecord(id="miss", topic="T", summary="无关"))
+
+            for topic in (None, "T"):
+                hits = store.retrieve(topic=topic, query="项目", limit=4)
+                assert [h.record.id for h in hits] == ["tf-3", "tf-2", "tf-1", "miss"]
+
     def test_handles_malformed_lines(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             path = Path(tmpdir) / "memory.jsonl"
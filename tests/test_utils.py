@@ -1,9 +1,13 @@
 """Tests for exogram.utils module."""
 from __future__ import annotations
 
+import json
+import tempfile
+from pathlib import Path
+
 import pytest
 
-from exogram.utils import get_logger, normalize_text, safe_preview_value
+from exogram.utils import atomic_write_text, get_logger, json_dumps, json_loads, normalize_text, safe_preview_value
 
 
 class TestNormalizeText:
@@ -24,6 +28,53 @@ class TestNormalizeText:
     def test_already_normalized(self):
         assert normalize_text("hello world") == "hello world"
 
+    def test_collapses_unicode_whitespace(self):
+        assert normalize_text("\u3000登录\u3000\xa0 按钮\r\n") == "登录 按钮"
+
+
+class TestJsonLoads:
+    """Tests for json_loads function."""
+
+    def test_parses_str_and_bytes(self):
+        assert json_loads('{"a": [1, "中"]}') == {"a": [1, "中"]}
+        assert json_loads('{"a": 1}'.encode("utf-8")) == {"a": 1}
+
+    def test_invalid_raises_json_decode_error(self):
+        with pytest.raises(json.JSONDecodeError):
+            json_loads("{not json")
+
+
+class TestJsonDumps:
+    """Tests for json_dumps function."""
+
+    def test_compact_round_trip(self):
+        obj = {"name": "中文", "items": [1, 2.5, None, True]}
+        assert json.loads(json_dumps(obj)) == obj
+        assert "中文" in json_dumps(obj)
+
+    def test_indent_matches_stdlib(self):
+        obj = {"a": [1, {"b": "c"}], "d": {}}
+        assert json_dumps(obj, indent=True) == json.dumps(obj, ensure_ascii=False, indent=2)
+
+    def test_sort_keys_compact_matches_stdlib(self):
+        obj = {"b": 1, "a": {"d": "中", "c": [True, None]}}
+        expected = json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+        assert json_dumps(obj, sort_keys=True) == expected
+
+
+class TestAtomicWriteText:
+    """Tests for atomic_write_text function."""
+
+    def test_replaces_content_without_leftovers(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "out.json"
+            path.write_text("old", encoding="utf-8")
+
+            atomic_write_text(path, "新内容")
+
+            assert path.read_text(encoding="utf-8") == "新内容"
+            assert [p.name for p in Path(tmpdir).iterdir()] == ["out.json"]
+
 
 class TestSafePreviewValue:
     """Tests for safe_preview_value function."""
@@ -49,6 +100,11 @@ class TestSafePreviewValue:
         result = safe_preview_value("  hello   world  ")
         assert result == "hello world"
 
+    def test_fast_path_matches_normalize(self):
+        for text in ["a b", "登录\u3000按钮", "x\xa0y", " a", "a ", "a  b", "a\u200bb", "\u2028"]:
+            expected = normalize_text(text)
+            assert safe_preview_value(text) == expected
+
 
 class TestGetLogger:
     """Tests for get_logger function."""